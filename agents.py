@@ -0,0 +1,39 @@
+"""Agent templates shared by every planning run."""
+from typing import Any, List
+
+from crewai import Agent
+
+from tracing import record_agent_step
+
+# Static parts of each agent; the goal is filled in per request.
+AGENT_TEMPLATES = {
+    "researcher": {
+        "role": "Local Destination Expert",
+        "goal": "Discover activities in {city} for {month} suitable for groups",
+        "backstory": "Local expert focusing on group-friendly gems and weather.",
+    },
+    "transporter": {
+        "role": "Global Transport Specialist",
+        "goal": "Find flight details and per-person fares from {origin} to {city}",
+        "backstory": "Expert in group travel logistics and ticket costs.",
+    },
+    "logistics_pro": {
+        "role": "Travel Logistics Pro",
+        "goal": "Assemble a {duration}-day itinerary for {people} people and create a cost breakdown",
+        "backstory": "Meticulous planner balancing flights and group costs with a final split-bill analysis.",
+    },
+}
+
+
+def build_agent(
+    name: str, llm: Any, tools: List[Any], verbose: bool = True, step_callback: Any = record_agent_step, **params: Any
+) -> Agent:
+    """Instantiate the ``name`` template with this request's parameters."""
+    template = AGENT_TEMPLATES[name]
+    return Agent(
+        role=template["role"],
+        goal=template["goal"].format(**params),
+        backstory=template["backstory"],
+        tools=tools, llm=llm, verbose=verbose,
+        step_callback=step_callback
+    )
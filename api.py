@@ -0,0 +1,308 @@
+"""HTTP planning API: the page's pipeline behind JSON endpoints, run on a pool of warm worker processes.
+
+Usage:
+    python api.py --port 8080 --processes 4
+
+Endpoints:
+    POST /v1/plans          plan a trip and wait for it (200, or 503 when the queue is full)
+    POST /v1/jobs           queue a trip and return at once (202 with a job id)
+    GET  /v1/jobs/<job_id>  job status, then its plan
+    GET  /healthz           liveness and queue depth
+    GET  /metrics           request counts, latencies, queue and worker stats
+
+Requests take the same fields as batch_plan.py: origin, city, month,
+duration, people, budget and optionally currency ("USD" or "INR").
+Credentials come from OPENAI_API_KEY and SERPER_API_KEY. The OpenAI and
+Serper rate limits (TRAVEL_PLANNER_*_RPS) apply to the server as a whole;
+each worker process gets an equal share.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from fares import percentile
+from jobs import JobQueue, JobQueueFull
+
+# Planning processes; each keeps its own warm LLM and search clients.
+API_PROCESSES = int(os.environ.get("TRAVEL_PLANNER_API_PROCESSES", "2"))
+# Requests waiting or running at once, more are turned away with 503; 0 allows four per process.
+API_MAX_PENDING = int(os.environ.get("TRAVEL_PLANNER_API_MAX_PENDING", "0"))
+# Plans a worker process handles before it is replaced, to bound slow leaks; 0 never replaces it.
+# Needs Python 3.11+ (ProcessPoolExecutor's max_tasks_per_child); older versions ignore it.
+API_MAX_TASKS_PER_WORKER = int(os.environ.get("TRAVEL_PLANNER_API_MAX_TASKS_PER_WORKER", "0"))
+REQUIRED_FIELDS = ("origin", "city", "month", "duration", "people", "budget")
+CURRENCIES = ("USD", "INR")
+SYNC_POLL_INTERVAL = 0.1
+RETRY_AFTER = "5"
+
+
+def parse_trip(request: dict) -> dict:
+    """plan_trip keyword arguments from a request body; raises ValueError on bad input."""
+    missing = [name for name in REQUIRED_FIELDS if name not in request]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    currency = str(request.get("currency", "USD")).upper()
+    if currency not in CURRENCIES:
+        raise ValueError(f"currency must be one of {', '.join(CURRENCIES)}")
+    trip = dict(
+        origin=str(request["origin"]), city=str(request["city"]), month=str(request["month"]),
+        duration=int(request["duration"]), people=int(request["people"]), budget=float(request["budget"]),
+        currency=currency,
+    )
+    if trip["duration"] < 1 or trip["people"] < 1 or trip["budget"] <= 0:
+        raise ValueError("duration, people and budget must be positive")
+    return trip
+
+
+def _init_worker(processes: int) -> None:
+    """Runs once in each worker process: load the agent stack and build its clients before any request."""
+    # Ctrl-C is the parent's to handle; it shuts the pool down.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # crewAI prints progress to stdout; keep the server's stdout for its own logs.
+    sys.stdout = sys.stderr
+    from ratelimit import RATE_LIMITS
+
+    # Token buckets are per process, so each worker keeps to its share of the configured rates.
+    for provider, (rate, burst) in RATE_LIMITS.items():
+        RATE_LIMITS[provider] = (rate / processes, max(1, burst // processes))
+    from resources import get_llm, get_search_tool
+    from startup import load_agent_stack
+
+    load_agent_stack("worker")
+    get_llm(os.environ["OPENAI_API_KEY"])
+    get_search_tool(os.environ["SERPER_API_KEY"])
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _plan(trip: dict) -> dict:
+    from planner import plan_trip
+
+    return dict(plan_trip(**trip).to_dict(), worker=os.getpid())
+
+
+def _pool_context():
+    # Workers start from a fresh interpreter, not a fork of a parent already running server threads.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class PlanningService:
+    """A process pool fed through a bounded JobQueue, whose threads each wait on one worker process.
+
+    A worker that dies mid-plan fails the plans the pool was running and the
+    pool is replaced, rather than leaving their jobs running forever.
+    """
+
+    def __init__(self, processes: int = API_PROCESSES, max_pending: int = API_MAX_PENDING, max_tasks_per_worker: int = API_MAX_TASKS_PER_WORKER):
+        self.processes = processes
+        self.max_tasks_per_worker = max_tasks_per_worker
+        max_pending = max_pending or processes * 4
+        self.pool = self._start_pool()
+        self.jobs = JobQueue(max_workers=processes, max_pending=max_pending)
+        self.max_pending = max_pending
+        self.started = time.time()
+        self.counts = Counter()
+        self.latencies = deque(maxlen=1000)
+        self.pool_restarts = 0
+        self._lock = threading.Lock()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        options = {}
+        if self.max_tasks_per_worker and sys.version_info >= (3, 11):
+            options["max_tasks_per_child"] = self.max_tasks_per_worker
+        pool = ProcessPoolExecutor(
+            self.processes, mp_context=_pool_context(), initializer=_init_worker, initargs=(self.processes,), **options,
+        )
+        # Workers start on demand; one no-op each starts (and warms) them all before the first request.
+        for _ in range(self.processes):
+            pool.submit(_ready)
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self.pool is not broken:
+                return
+            self.pool = self._start_pool()
+            self.pool_restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, trip: dict) -> dict:
+        started = time.perf_counter()
+        pool = self.pool
+        try:
+            try:
+                future = pool.submit(_plan, trip)
+            except BrokenProcessPool:
+                # Broken while an earlier plan ran; this one hasn't started, so it goes to the replacement.
+                self._replace_pool(pool)
+                pool = self.pool
+                future = pool.submit(_plan, trip)
+            return future.result()
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            raise
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - started)
+
+    def submit(self, trip: dict) -> str:
+        return self.jobs.submit(self._run, trip)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counts, latencies = dict(self.counts), sorted(self.latencies)
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "processes": self.processes,
+            "max_pending": self.max_pending,
+            "pool_restarts": self.pool_restarts,
+            "jobs": self.jobs.stats(),
+            "requests": counts,
+            "plan_seconds": {f"p{q}": percentile(latencies, q) if latencies else None for q in (50, 95, 99)},
+        }
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: PlanningService = None
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_trip(self) -> Optional[dict]:
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            return parse_trip(body)
+        except (ValueError, TypeError) as e:
+            self.service.count("bad_request")
+            self._send_json(400, {"error": str(e)})
+            return None
+
+    def _submit(self, trip: dict) -> Optional[str]:
+        try:
+            return self.service.submit(trip)
+        except JobQueueFull as e:
+            self.service.count("rejected")
+            self._send_json(503, {"error": str(e)}, {"Retry-After": RETRY_AFTER})
+            return None
+
+    def _job_body(self, job_id: str) -> Optional[dict]:
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            return None
+        body = {"job_id": job_id, "status": job.status}
+        if not job.done:
+            body["queue_position"] = self.service.jobs.position(job_id)
+        elif job.error:
+            body["error"] = job.error
+        else:
+            body["result"] = job.result
+        return body
+
+    def do_POST(self):
+        if self.path not in ("/v1/plans", "/v1/jobs"):
+            self._send_json(404, {"error": "not found"})
+            return
+        trip = self._read_trip()
+        if trip is None:
+            return
+        job_id = self._submit(trip)
+        if job_id is None:
+            return
+        if self.path == "/v1/jobs":
+            self.service.count("jobs")
+            self._send_json(202, {"job_id": job_id, "status": "queued"}, {"Location": f"/v1/jobs/{job_id}"})
+            return
+
+        self.service.count("plans")
+        while not self.service.jobs.get(job_id).done:
+            time.sleep(SYNC_POLL_INTERVAL)
+        job = self.service.jobs.collect(job_id)
+        if job.error:
+            self._send_json(500, {"error": job.error})
+        else:
+            self._send_json(200, job.result)
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            stats = self.service.jobs.stats()
+            pending = stats["queued"] + stats["running"]
+            self._send_json(200, {
+                "status": "ok" if pending < self.service.max_pending else "saturated",
+                "pending": pending, "max_pending": self.service.max_pending,
+            })
+        elif self.path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        elif self.path.startswith("/v1/jobs/"):
+            body = self._job_body(self.path[len("/v1/jobs/"):])
+            if body is None:
+                self._send_json(404, {"error": "unknown or expired job"})
+            else:
+                self._send_json(200, body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+def serve(host: str, port: int, service: PlanningService) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the travel planner over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--processes", type=int, default=API_PROCESSES, help="planning worker processes")
+    parser.add_argument("--max-pending", type=int, default=API_MAX_PENDING, help="queue capacity; 0 allows four per process")
+    args = parser.parse_args(argv)
+
+    missing = [name for name in ("OPENAI_API_KEY", "SERPER_API_KEY") if not os.environ.get(name)]
+    if missing:
+        print(f"Set {' and '.join(missing)} first.", file=sys.stderr)
+        return 1
+
+    service = PlanningService(args.processes, args.max_pending)
+    server = serve(args.host, args.port, service)
+    print(f"Planning API on http://{args.host}:{server.server_port} with {args.processes} worker process(es)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Plan trips in bulk: JSONL requests in, JSONL results out.
+
+Usage:
+    python batch_plan.py requests.jsonl -o results.jsonl --workers 4
+
+Each input line holds origin, city, month, duration, people, budget and
+optionally currency ("USD" or "INR") and id. Results are written as each
+request finishes, so the output order follows completion, not input.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from planner import plan_trip
+
+REQUIRED_FIELDS = ("origin", "city", "month", "duration", "people", "budget")
+
+
+def read_requests(path):
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as source:
+        for line_number, line in enumerate(source, start=1):
+            if line.strip():
+                yield line_number, line
+
+
+def run_request(line_number, line, verbose=False):
+    started = time.perf_counter()
+    record = {"id": line_number}
+    try:
+        request = json.loads(line)
+        record["id"] = request.get("id", line_number)
+        record["input"] = request
+        missing = [name for name in REQUIRED_FIELDS if name not in request]
+        if missing:
+            raise ValueError(f"missing fields: {', '.join(missing)}")
+        result = plan_trip(
+            request["origin"], request["city"], request["month"],
+            int(request["duration"]), int(request["people"]), float(request["budget"]),
+            request.get("currency", "USD"), verbose=verbose,
+        )
+        record.update(result.to_dict())
+        record["error"] = None
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record.setdefault("timings", {})["total"] = time.perf_counter() - started
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate travel plans from a JSONL file of requests.")
+    parser.add_argument("input", help="JSONL file of trip requests, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file to append results to (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="requests planned concurrently")
+    parser.add_argument("--verbose", action="store_true", help="print agent reasoning to stderr")
+    args = parser.parse_args(argv)
+
+    sink = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    # crewAI prints progress to stdout; keep it out of any JSONL written there.
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    write_lock = threading.Lock()
+    counts = {"ok": 0, "insufficient_budget": 0, "error": 0}
+
+    def write(record):
+        with write_lock:
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sink.flush()
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+
+    # Keep at most two requests per worker in flight so huge inputs stream instead of loading up front.
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        running = set()
+        for line_number, line in read_requests(args.input):
+            if len(running) >= args.workers * 2:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+            running.add(pool.submit(run_request, line_number, line, args.verbose))
+        for future in wait(running).done:
+            write(future.result())
+
+    sys.stdout = real_stdout
+    if sink is not real_stdout:
+        sink.close()
+    print(f"Planned {sum(counts.values())} request(s): {counts}", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Offline per-phase benchmark of the planner's own overhead.
+
+Runs the same Agent/Task/Crew graph as the app (planner.TripPlanner) against
+the fakes in benchmarks/fakes.py, so no network or API keys are involved.
+
+Usage:
+    python benchmarks/bench_planner.py --repeat 5
+    python benchmarks/bench_planner.py --llm-latency 0.2 --search-latency 0.1
+    python benchmarks/bench_planner.py --save-baseline
+    python benchmarks/bench_planner.py --check          # exit 1 on regression
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Keep crewAI's telemetry exporter off the network; the benchmark must stay offline.
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from fakes import FakeChatModel, FakeSearchTool, fake_destination_index  # noqa: E402
+from planner import TripPlanner  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+PHASES = ("setup", "preliminary", "budget_check", "itinerary", "render")
+
+TRIP = dict(origin="Mumbai", city="London", month="June 2026", duration=3, people=2, budget=3000, unit="$")
+
+
+def render(plan: str) -> None:
+    import streamlit as st
+
+    st.markdown(plan)
+
+
+def run_once(llm_latency: float, search_latency: float, tool_steps: int, trace_memory: bool = False) -> dict:
+    """One full plan; returns per-phase wall time, call counts and (optionally) peak memory."""
+    llm = FakeChatModel(latency=llm_latency, tool_steps=tool_steps)
+    search_tool = FakeSearchTool(latency=search_latency)
+    results = {}
+    state = {}
+
+    steps = {
+        "setup": lambda: state.update(planner=TripPlanner(
+            llm=llm, search_tool=search_tool, verbose=False, destination_index=fake_destination_index(), **TRIP
+        )),
+        "preliminary": lambda: state["planner"].run_preliminary(),
+        "budget_check": lambda: state["planner"].validate_budget(),
+        "itinerary": lambda: state.update(plan=state["planner"].run_itinerary()),
+        "render": lambda: render(state["plan"]),
+    }
+
+    for phase in PHASES:
+        llm_calls, search_calls, prompt_chars = llm.calls, search_tool.calls, llm.prompt_chars
+        if trace_memory:
+            tracemalloc.start()
+        # crewAI echoes tool output to stdout; still pay for it, just don't show it.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            steps[phase]()
+            wall = time.perf_counter() - started
+        results[phase] = {
+            "wall": wall,
+            "llm_calls": llm.calls - llm_calls,
+            "search_calls": search_tool.calls - search_calls,
+            "prompt_chars": llm.prompt_chars - prompt_chars,
+        }
+        if trace_memory:
+            results[phase]["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+    return results
+
+
+def summarize(runs: list, memory_run: dict) -> dict:
+    summary = {}
+    for phase in PHASES:
+        walls = [run[phase]["wall"] for run in runs]
+        summary[phase] = {
+            "wall_median": statistics.median(walls),
+            "wall_min": min(walls),
+            "llm_calls": runs[-1][phase]["llm_calls"],
+            "search_calls": runs[-1][phase]["search_calls"],
+            "prompt_chars": runs[-1][phase]["prompt_chars"],
+            "peak_kb": memory_run[phase]["peak_kb"],
+        }
+    return summary
+
+
+def find_regressions(summary: dict, baseline: dict, tolerance: float, floor: float) -> list:
+    """Phases that got slower, hungrier or chattier than the stored baseline."""
+    problems = []
+    for phase, current in summary.items():
+        previous = baseline.get(phase)
+        if not previous:
+            continue
+        limit = previous["wall_median"] * (1 + tolerance) + floor
+        if current["wall_median"] > limit:
+            problems.append(f"{phase}: wall {current['wall_median'] * 1000:.1f}ms > limit {limit * 1000:.1f}ms")
+        if current["peak_kb"] > previous["peak_kb"] * (1 + tolerance) + 256:
+            problems.append(f"{phase}: peak memory {current['peak_kb']:.0f}KB vs baseline {previous['peak_kb']:.0f}KB")
+        for counter in ("llm_calls", "search_calls"):
+            if current[counter] > previous[counter]:
+                problems.append(f"{phase}: {counter} {current[counter]} vs baseline {previous[counter]}")
+    return problems
+
+
+def print_table(summary: dict) -> None:
+    print(f"{'phase':<14}{'median ms':>11}{'min ms':>9}{'llm':>6}{'search':>8}{'prompt chars':>14}{'peak KB':>10}")
+    for phase, row in summary.items():
+        print(
+            f"{phase:<14}{row['wall_median'] * 1000:>11.1f}{row['wall_min'] * 1000:>9.1f}{row['llm_calls']:>6}"
+            f"{row['search_calls']:>8}{row['prompt_chars']:>14}{row['peak_kb']:>10.0f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark planner overhead against fake LLM and search backends.")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per phase (median is reported)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="simulated seconds per search call")
+    parser.add_argument("--tool-steps", type=int, default=1, help="searches each agent makes before answering")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any phase regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--floor", type=float, default=0.005, help="absolute slack in seconds for tiny phases")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    # Warm-up run absorbs import and first-construction costs.
+    run_once(args.llm_latency, args.search_latency, args.tool_steps)
+    runs = [run_once(args.llm_latency, args.search_latency, args.tool_steps) for _ in range(args.repeat)]
+    memory_run = run_once(args.llm_latency, args.search_latency, args.tool_steps, trace_memory=True)
+    summary = summarize(runs, memory_run)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_table(summary)
+
+    # Timings are only comparable between runs with the same simulated backends.
+    config = {"llm_latency": args.llm_latency, "search_latency": args.search_latency, "tool_steps": args.tool_steps}
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({"config": config, "phases": summary}, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.", file=sys.stderr)
+            return 1
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["config"] != config:
+            print(f"Baseline was recorded with {baseline['config']}, not {config}.", file=sys.stderr)
+            return 1
+        problems = find_regressions(summary, baseline["phases"], args.tolerance, args.floor)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
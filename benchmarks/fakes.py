@@ -0,0 +1,134 @@
+"""Deterministic local stand-ins for ChatOpenAI and SerperDevTool."""
+import json
+import threading
+import time
+from typing import Any
+
+from crewai_tools import BaseTool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from destinations import DestinationIndex
+
+_counter_lock = threading.Lock()
+
+RESEARCH_ANSWER = "\n".join(
+    f"{n}. Sight {n}: a group-friendly highlight, open daily, about 2 hours." for n in range(1, 6)
+)
+
+TRANSPORT_ANSWER = (
+    "1. FakeAir FA101, departs 08:00, arrives 14:00, $450 per person.\n"
+    "2. FakeAir FA205, departs 21:30, arrives 03:30, $390 per person.\n"
+    "```json\n"
+    + json.dumps({
+        "currency": "USD", "price_basis": "per_person", "travelers": 1,
+        "fares": [
+            {"airline": "FakeAir", "flight_number": "FA101", "departure": "08:00", "arrival": "14:00", "price": 450},
+            {"airline": "FakeAir", "flight_number": "FA205", "departure": "21:30", "arrival": "03:30", "price": 390},
+        ],
+    })
+    + "\n```"
+)
+
+
+def itinerary_answer(days: int = 3) -> str:
+    lines = ["## Travel Logistics", "FakeAir FA205, $390 per person.", ""]
+    for day in range(1, days + 1):
+        lines += [f"### Day {day}", "- Morning: Sight tour", "- Afternoon: Museum", "- Evening: Dinner", ""]
+    lines += [
+        "## 💰 Group Cost Summary",
+        "| Item | Cost |", "|---|---|",
+        "| Total Flight Cost | $780 |", "| Estimated Total Hotel/Food Cost | $480 |",
+        "| Total Trip Cost | $1260 |", "| COST PER PERSON | $630 |",
+    ]
+    return "\n".join(lines)
+
+
+def fake_reply(prompt: str, tool_steps: int = 1, city: str = "London") -> str:
+    """The ReAct step an agent would take next: a tool call until ``tool_steps`` are done, then its answer."""
+    scratchpad = prompt.rsplit("Begin!", 1)[-1]
+    step = scratchpad.count("Observation:") + 1
+    if "Destination guide" in prompt and step <= tool_steps:
+        return (
+            "Thought: I should check the destination guide.\n"
+            "Action: Destination guide\n"
+            f'Action Input: {{"city": "{city}", "month": "June 2026"}}'
+        )
+    if "Search the internet" in prompt and step <= tool_steps:
+        query = "flights" if "Transport Specialist" in prompt else "sights"
+        return (
+            "Thought: I should search for this.\n"
+            "Action: Search the internet\n"
+            f'Action Input: {{"search_query": "{query} {city} step {step}"}}'
+        )
+    if "Transport Specialist" in prompt:
+        answer = TRANSPORT_ANSWER
+    elif "Logistics Pro" in prompt:
+        answer = itinerary_answer()
+    else:
+        answer = RESEARCH_ANSWER
+    return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+def fake_search_results(search_query: str) -> list:
+    return [
+        {"title": f"Result {n} for {search_query}", "link": f"https://example.com/{n}", "snippet": f"Fake snippet {n}."}
+        for n in range(1, 6)
+    ]
+
+
+class FakeChatModel(BaseChatModel):
+    """Answers crewAI's ReAct prompts per agent role after ``tool_steps`` searches."""
+
+    latency: float = 0.0
+    tool_steps: int = 1
+    calls: int = 0
+    prompt_chars: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        with _counter_lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+
+        text = fake_reply(prompt, self.tool_steps)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class FakeSearchTool(BaseTool):
+    """Drop-in for the Serper search tool with a fixed answer and simulated latency."""
+
+    name: str = "Search the internet"
+    description: str = "A tool that can be used to search the internet with a search_query."
+    latency: float = 0.0
+    calls: int = 0
+
+    def _run(self, search_query: str) -> str:
+        with _counter_lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        results = "\n".join(
+            f"Title: {result['title']}\nLink: {result['link']}\nSnippet: {result['snippet']}\n---"
+            for result in fake_search_results(search_query)
+        )
+        return f"\nSearch results: {results}\n"
+
+
+def fake_destination_index() -> DestinationIndex:
+    """An index that knows the benchmark's destination, so research never searches."""
+    return DestinationIndex({
+        "london": {
+            "name": "London",
+            "sights": [f"Sight {n}: a group-friendly highlight" for n in range(1, 6)],
+            "daily_costs": ["Mid-range hotel about $180 per night", "Meals about $60 per person per day"],
+            "months": {"june": {"weather": ["Mild, 14-22°C, occasional showers"]}},
+        },
+    })
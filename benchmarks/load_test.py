@@ -0,0 +1,248 @@
+"""Concurrent-session load test of the Streamlit page against local mock OpenAI and Serper servers.
+
+Each simulated session is a browser tab on travel-agent-planner.py: the real
+script runs in this process the way Streamlit runs it, with its own session
+state. A session fills in the form, clicks Generate and, like the page does,
+reruns the whole script every half second until its job is done, so every
+waiting session's sidebar stats queries and rendering are part of the load.
+The real ChatOpenAI and Serper clients talk HTTP to the mocks in
+benchmarks/mock_servers.py, so connection pools, rate limiters, retries and
+the job queue's admission control are all under load too. Every plan is for
+a different city, so the caches and request coalescing don't hide the work.
+
+Usage:
+    python benchmarks/load_test.py --levels 1,2,4,8,16
+    python benchmarks/load_test.py --llm-latency 0.8 --llm-jitter 0.5 --error-rate 0.02
+    python benchmarks/load_test.py --workers 8 --client-rps 20 --no-stream --json
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from startup import rss_mb  # noqa: E402
+
+PAGE = str(Path(__file__).resolve().parent.parent / "travel-agent-planner.py")
+POLL_INTERVAL = 0.5
+TRIP = {"Flying From": "Mumbai", "Travel Month": "June 2026", "Duration (Days)": 3, "Number of People": 2, "Total Budget ($)": 3000}
+
+
+def configure(args) -> None:
+    """Point the app at throwaway caches and the requested limits; must run before the app modules are imported."""
+    scratch = tempfile.mkdtemp(prefix="travel-planner-load-")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    os.environ["TRAVEL_PLANNER_CACHE_DIR"] = scratch
+    os.environ["TRAVEL_PLANNER_TRACE_FILE"] = os.path.join(scratch, "traces.jsonl")
+    # Load-test cities differ only by number, which is all a similarity cache would see.
+    os.environ["TRAVEL_PLANNER_SEMANTIC_CACHE"] = "0"
+    os.environ["TRAVEL_PLANNER_JOB_WORKERS"] = str(args.workers)
+    if args.max_pending:
+        os.environ["TRAVEL_PLANNER_MAX_PENDING_JOBS"] = str(args.max_pending)
+    if args.client_rps:
+        for provider in ("OPENAI", "SERPER"):
+            os.environ[f"TRAVEL_PLANNER_{provider}_RPS"] = str(args.client_rps)
+            os.environ[f"TRAVEL_PLANNER_{provider}_BURST"] = str(max(1, int(args.client_rps * 2)))
+
+
+def quantile(values: list, q: float) -> float:
+    from fares import percentile
+
+    return percentile(sorted(values), q) if values else 0.0
+
+
+def page_session_class():
+    """AppTest that runs the page the way a Streamlit server does.
+
+    AppTest installs a mock runtime per run and removes it afterwards, so
+    sessions can't run side by side; here one runtime, installed by
+    :func:`install_runtime`, serves every session. Its runner also keeps
+    button clicks set across ``st.rerun()``, which would resubmit a plan on
+    every poll, so finished runs are cleaned up as the server's runner does.
+    """
+    from streamlit.runtime.scriptrunner.script_runner import ScriptRunner
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    class PageRunner(LocalScriptRunner):
+        _on_script_finished = ScriptRunner._on_script_finished
+
+    class PageSession(AppTest):
+        def _run(self, widget_state=None, timeout=None):
+            runner = PageRunner(self._script_path, self.session_state)
+            self._tree = runner.run(widget_state, self.query_params, timeout or self.default_timeout)
+            self._tree._runner = self
+            return self
+
+    return PageSession
+
+
+def install_runtime() -> None:
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+
+def widget(widgets, label: str):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def run_level(concurrency: int, sessions: int, args, cities) -> dict:
+    PageSession = page_session_class()
+    samples, lock = [], threading.Lock()
+    work = iter(range(sessions))
+
+    def session():
+        page = PageSession(PAGE, default_timeout=args.plan_timeout).run()
+        widget(page.sidebar.text_input, "OpenAI API Key").input("load-test")
+        widget(page.sidebar.text_input, "Serper API Key").input("load-test")
+        widget(page.sidebar.toggle, "Stream itinerary as it's written").set_value(not args.no_stream)
+        page.run()
+        for _ in iter(lambda: next(work, None), None):
+            widget(page.text_input, "Going To").input(next(cities))
+            for label, value in TRIP.items():
+                widget(page.text_input if isinstance(value, str) else page.number_input, label).set_value(value)
+            submitted = time.time()
+            # The click's run keeps rerunning the script, as the page polls its job, until the plan is shown.
+            widget(page.button, "Generate Complete Travel Plan").click().run()
+            job = page.session_state["last_plan"] if "last_plan" in page.session_state else None
+            if job is None and any(warning.value.startswith("⏳") for warning in page.warning):
+                with lock:
+                    samples.append({"rejected": True})
+                time.sleep(POLL_INTERVAL)
+                continue
+            failed = job is None or job.error is not None or len(page.exception) > 0
+            sample = {"rejected": False, "failed": failed, "latency": time.time() - submitted}
+            if not failed:
+                sample["queue_wait"] = job.started - job.created
+                sample["breakdown"] = job.result.breakdown
+            with lock:
+                samples.append(sample)
+
+    rss_before, cpu_before = rss_mb(), time.process_time()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return summarize(concurrency, samples, wall, rss_before, time.process_time() - cpu_before)
+
+
+def summarize(concurrency: int, samples: list, wall: float, rss_before: float, cpu_seconds: float) -> dict:
+    finished = [sample for sample in samples if not sample["rejected"]]
+    succeeded = [sample for sample in finished if not sample["failed"]]
+    latencies = [sample["latency"] for sample in succeeded]
+    phases, throttle = defaultdict(list), []
+    for sample in succeeded:
+        for row in sample["breakdown"]:
+            if not row["step"].startswith(" "):
+                phases[row["step"]].append(row["seconds"])
+        throttle.append(sum(row["throttle_ms"] for row in sample["breakdown"] if not row["step"].startswith(" ")))
+    return {
+        "concurrency": concurrency,
+        "plans": len(succeeded),
+        "failed": len(finished) - len(succeeded),
+        "rejected": len(samples) - len(finished),
+        "throughput_per_min": 60 * len(succeeded) / wall if wall else 0.0,
+        "p50": quantile(latencies, 50),
+        "p95": quantile(latencies, 95),
+        "p99": quantile(latencies, 99),
+        "queue_wait_p50": quantile([sample["queue_wait"] for sample in succeeded], 50),
+        "throttle_ms_p50": quantile(throttle, 50),
+        "phases_p50": {phase: quantile(seconds, 50) for phase, seconds in phases.items()},
+        # Page reruns, planning threads and clients together, per plan finished.
+        "cpu_s_per_plan": cpu_seconds / len(succeeded) if succeeded else 0.0,
+        "rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - rss_before,
+    }
+
+
+def print_table(levels: list) -> None:
+    phases = list(dict.fromkeys(phase for level in levels for phase in level["phases_p50"]))
+    print(
+        f"{'sessions':>8}{'plans':>7}{'fail':>6}{'rej':>5}{'plans/min':>11}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+        f"{'queue s':>9}{'throttle ms':>13}{'CPU s/plan':>12}" + "".join(f"{phase[:12]:>14}" for phase in phases) + f"{'RSS MB':>9}"
+    )
+    for level in levels:
+        print(
+            f"{level['concurrency']:>8}{level['plans']:>7}{level['failed']:>6}{level['rejected']:>5}"
+            f"{level['throughput_per_min']:>11.1f}{level['p50']:>8.2f}{level['p95']:>8.2f}{level['p99']:>8.2f}"
+            f"{level['queue_wait_p50']:>9.2f}{level['throttle_ms_p50']:>13.0f}{level['cpu_s_per_plan']:>12.2f}"
+            + "".join(f"{level['phases_p50'].get(phase, 0):>14.2f}" for phase in phases)
+            + f"{level['rss_mb']:>9.0f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp concurrent page sessions against mock OpenAI and Serper servers.")
+    parser.add_argument("--levels", default="1,2,4,8", help="comma-separated concurrent session counts to ramp through")
+    parser.add_argument("--plans-per-session", type=int, default=2, help="plans each session requests per level")
+    parser.add_argument("--workers", type=int, default=4, help="job queue workers (TRAVEL_PLANNER_JOB_WORKERS)")
+    parser.add_argument("--max-pending", type=int, default=0, help="job queue capacity; 0 keeps the app default")
+    parser.add_argument("--client-rps", type=float, default=0, help="override both providers' client rate limits")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="median seconds per mock completion")
+    parser.add_argument("--llm-jitter", type=float, default=0.3, help="lognormal sigma of the completion latency")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="median seconds per mock search")
+    parser.add_argument("--search-jitter", type=float, default=0.3, help="lognormal sigma of the search latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of mock requests answered with 429 or 500")
+    parser.add_argument("--tool-steps", type=int, default=1, help="searches each agent makes before answering")
+    parser.add_argument("--no-stream", action="store_true", help="turn off the page's itinerary streaming toggle")
+    parser.add_argument("--plan-timeout", type=float, default=600, help="seconds a session waits for one plan")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    configure(args)
+    from mock_servers import CITY_NAME, Behaviour, mock_openai, mock_serper
+
+    openai_behaviour = Behaviour(args.llm_latency, args.llm_jitter, args.error_rate, args.tool_steps)
+    serper_behaviour = Behaviour(args.search_latency, args.search_jitter, args.error_rate)
+    with mock_openai(openai_behaviour) as openai_server, mock_serper(serper_behaviour) as serper_server:
+        # ChatOpenAI reads its base URL when each client is built; the search tool when it's imported, below.
+        os.environ["OPENAI_API_BASE"] = f"{openai_server.url}/v1"
+        os.environ["TRAVEL_PLANNER_SERPER_URL"] = f"{serper_server.url}/search"
+        from startup import load_agent_stack
+
+        # Loaded up front, so the first level isn't timing imports.
+        load_agent_stack("load-test")
+        install_runtime()
+        cities = map(CITY_NAME.format, itertools.count(1))
+        levels = []
+        for concurrency in (int(level) for level in args.levels.split(",")):
+            # crewAI echoes every step to stdout; keep the report readable.
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                level = run_level(concurrency, concurrency * args.plans_per_session, args, cities)
+            levels.append(level)
+            print(f"{concurrency} sessions: {level['plans']} plans, p95 {level['p95']:.2f}s", file=sys.stderr)
+
+    mocks = {
+        "openai": {"requests": openai_behaviour.requests, "errors": openai_behaviour.errors},
+        "serper": {"requests": serper_behaviour.requests, "errors": serper_behaviour.errors},
+    }
+    if args.json:
+        print(json.dumps({"levels": levels, "mocks": mocks}, indent=2))
+    else:
+        print_table(levels)
+        print(f"mock requests: {mocks}")
+    return 0 if all(level["failed"] == 0 for level in levels) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
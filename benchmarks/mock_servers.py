@@ -0,0 +1,161 @@
+"""Local HTTP stand-ins for the OpenAI chat completions and Serper search endpoints.
+
+Both answer like benchmarks/fakes.py, after a lognormal latency and with an
+optional share of 429/500 errors, so the real HTTP clients, retries and rate
+limiters are exercised without any network.
+"""
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from fakes import fake_reply, fake_search_results
+
+# Destinations the load test plans for; the mock LLM searches for whichever one the prompt names.
+CITY_NAME = "Loadtown {}"
+_CITY_PATTERN = re.compile(re.escape(CITY_NAME).replace(r"\{\}", r"\d+"))
+
+
+class Behaviour:
+    """Latency (median seconds, lognormal sigma) and error rate of one mock endpoint."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, tool_steps: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tool_steps = tool_steps
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        if not self.latency:
+            return 0.0
+        return self.latency * math.exp(random.gauss(0, self.jitter)) if self.jitter else self.latency
+
+    def error(self) -> Optional[int]:
+        """A status to fail this request with, or None to answer it."""
+        with self._lock:
+            self.requests += 1
+            if random.random() >= self.error_rate:
+                return None
+            self.errors += 1
+        return random.choice((429, 500))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    behaviour: Behaviour = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.behaviour.delay())
+        status = self.behaviour.error()
+        if status is not None:
+            self._send_json(status, {"error": {"message": "mock failure", "type": "mock"}}, {"Retry-After": "0.2"})
+            return
+        self.answer(request)
+
+    def answer(self, request: dict) -> None:
+        raise NotImplementedError
+
+
+class _OpenAIHandler(_Handler):
+    def answer(self, request: dict) -> None:
+        prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+        city = _CITY_PATTERN.search(prompt)
+        text = fake_reply(prompt, self.behaviour.tool_steps, city.group(0) if city else "London")
+        model = request.get("model", "mock")
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                    "total_tokens": (len(prompt) + len(text)) // 4,
+                },
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        pieces = [word + (" " if n < len(words) - 1 else "") for n, word in enumerate(words)]
+        for piece, finish in [(piece, None) for piece in pieces] + [("", "stop")]:
+            chunk = {
+                "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece} if piece else {}, "finish_reason": finish}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self._write_chunk("")
+
+    def _write_chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+class _SerperHandler(_Handler):
+    def answer(self, request: dict) -> None:
+        self._send_json(200, {"organic": fake_search_results(request.get("q", ""))})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream (e.g. after ``[DONE]``) are normal under load.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockServer:
+    """One mock endpoint on a free local port, served from a background thread."""
+
+    def __init__(self, handler: type, behaviour: Behaviour):
+        self.behaviour = behaviour
+        bound = type(handler.__name__, (handler,), {"behaviour": behaviour})
+        self.server = _Server(("127.0.0.1", 0), bound)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self) -> "MockServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def mock_openai(behaviour: Behaviour) -> MockServer:
+    """Serves ``POST /v1/chat/completions``, streamed or not."""
+    return MockServer(_OpenAIHandler, behaviour)
+
+
+def mock_serper(behaviour: Behaviour) -> MockServer:
+    """Serves ``POST /search`` with Serper's ``organic`` results."""
+    return MockServer(_SerperHandler, behaviour)
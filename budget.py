@@ -0,0 +1,99 @@
+"""Structured transport costs and the deterministic budget check."""
+import json
+import re
+from dataclasses import dataclass
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+CURRENCY_CODES = {"$": "USD", "₹": "INR"}
+
+# Typical food + hotel spend per person per day, by display unit.
+DAILY_MIN_PER_PERSON = {"$": 80, "₹": 6000}
+
+
+class FareOption(BaseModel):
+    airline: Optional[str] = None
+    flight_number: Optional[str] = None
+    departure: Optional[str] = None
+    arrival: Optional[str] = None
+    price: float = Field(ge=0)
+
+
+class TransportCosts(BaseModel):
+    """Cost record the transport task emits alongside its prose answer."""
+
+    currency: str
+    price_basis: Literal["per_person", "total"]
+    travelers: int = Field(default=1, ge=1)
+    fares: List[FareOption] = Field(min_length=1)
+
+    def cheapest_total(self, people: int) -> float:
+        """Cheapest fare scaled to the whole group."""
+        cheapest = min(fare.price for fare in self.fares)
+        if self.price_basis == "total":
+            cheapest = cheapest / self.travelers
+        return cheapest * people
+
+
+TRANSPORT_COSTS_FORMAT = (
+    "Finish with a ```json block describing the fares, exactly in this shape:\n"
+    '{"currency": "USD or INR", "price_basis": "per_person or total", "travelers": <number>, '
+    '"fares": [{"airline": "...", "flight_number": "...", "departure": "...", "arrival": "...", "price": <number>}]}'
+)
+
+
+def parse_transport_costs(text: str) -> Optional[TransportCosts]:
+    """Pull the last valid cost record out of the transport task's answer."""
+    candidates = re.findall(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            obj, _ = decoder.raw_decode(text, match.start())
+        except ValueError:
+            continue
+        candidates.append(json.dumps(obj))
+
+    for candidate in reversed(candidates):
+        try:
+            return TransportCosts.model_validate_json(candidate)
+        except ValidationError:
+            continue
+    return None
+
+
+@dataclass
+class BudgetCheck:
+    sufficient: bool
+    stay_total: float
+    transport_total: Optional[float]
+    min_total: float
+    # "ok", "missing" (no cost record parsed) or "currency_mismatch" (the record is in ``transport_currency``).
+    transport_status: str = "ok"
+    transport_currency: Optional[str] = None
+
+
+def check_budget(costs: Optional[TransportCosts], budget: float, duration: int, people: int, unit: str) -> BudgetCheck:
+    """Compare flights plus a typical stay against the budget, without an LLM round-trip.
+
+    Costs in a different currency than the page's are ignored, as are missing
+    ones; the check then covers the stay alone and ``transport_status`` says why.
+    """
+    stay_total = DAILY_MIN_PER_PERSON[unit] * duration * people
+    transport_total, status, currency = None, "missing", None
+    if costs is not None:
+        currency = costs.currency.upper()
+        if currency == CURRENCY_CODES[unit]:
+            transport_total, status = costs.cheapest_total(people), "ok"
+        else:
+            status = "currency_mismatch"
+
+    min_total = stay_total + (transport_total or 0)
+    return BudgetCheck(
+        sufficient=min_total <= budget,
+        stay_total=stay_total,
+        transport_total=transport_total,
+        min_total=min_total,
+        transport_status=status,
+        transport_currency=currency,
+    )
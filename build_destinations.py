@@ -0,0 +1,72 @@
+"""Build or refresh the local destination guide from web searches, ahead of time.
+
+Usage:
+    python build_destinations.py cities.txt
+    python build_destinations.py cities.txt --months june july --output data/destinations.json
+
+cities.txt holds one city per line, optionally followed by aliases after a
+"|" (e.g. "New York | NYC | New York City"). Needs SERPER_API_KEY. Cities
+already in the index are merged, so the months can be filled in over
+several runs.
+"""
+import argparse
+import os
+import sys
+
+from compaction import compact_handoff
+from destinations import DESTINATION_INDEX, DestinationIndex
+from normalize import MONTHS, canonical_city, canonical_month
+from resources import get_search_tool
+
+# Per-section token budget for the search snippets kept in the index.
+SECTION_TOKENS = 250
+
+
+def read_cities(path):
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            names = [name.strip() for name in line.split("|") if name.strip()]
+            if names and not names[0].startswith("#"):
+                yield names[0], names[1:]
+
+
+def facts(search_tool, query):
+    """Search results compacted to their salient lines, one fact per line."""
+    return compact_handoff(query, str(search_tool._run(search_query=query)), SECTION_TOKENS).text.splitlines()
+
+
+def build_entry(search_tool, city, aliases, months, entry=None):
+    entry = dict(entry or {}, name=city)
+    entry["aliases"] = sorted(set(entry.get("aliases", [])) | set(aliases))
+    entry["sights"] = facts(search_tool, f"top sights and attractions in {city}")
+    entry["daily_costs"] = facts(search_tool, f"{city} average daily travel cost hotel food transport")
+    entry.setdefault("months", {})
+    for month in months:
+        entry["months"][month] = {"weather": facts(search_tool, f"{city} weather in {month}")}
+    return entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the local destination guide used by the researcher agent.")
+    parser.add_argument("cities", help="file with one city per line")
+    parser.add_argument("-o", "--output", default=DESTINATION_INDEX, help=f"index file (default: {DESTINATION_INDEX})")
+    parser.add_argument("--months", nargs="*", default=MONTHS, help="months to fetch weather for (default: all)")
+    args = parser.parse_args(argv)
+
+    months = [canonical_month(month) for month in args.months]
+    if None in months:
+        parser.error(f"unrecognised month in {args.months}")
+
+    index = DestinationIndex.load(args.output)
+    search_tool = get_search_tool(os.environ["SERPER_API_KEY"])
+    for city, aliases in read_cities(args.cities):
+        print(f"Indexing {city}...", file=sys.stderr)
+        index.add(city, build_entry(search_tool, city, aliases, months, index.cities.get(canonical_city(city))))
+        # Save as we go so an interrupted build keeps what it already fetched.
+        index.save(args.output)
+    print(f"{len(index.cities)} cities in {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
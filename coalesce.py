@@ -0,0 +1,57 @@
+"""Single-flight coalescing of identical in-flight planning work."""
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Tuple
+
+# Phase 1 (route + destination research) and Phase 2 (itinerary) can be coalesced independently.
+COALESCE_PRELIMINARY = os.environ.get("TRAVEL_PLANNER_COALESCE_PRELIMINARY", "1") == "1"
+COALESCE_ITINERARY = os.environ.get("TRAVEL_PLANNER_COALESCE_ITINERARY", "1") == "1"
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution of ``fn``.
+
+    The first caller (the leader) runs it; everyone arriving while it is in
+    flight waits for and receives the same result or exception. Nothing is
+    kept once the call finishes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True for callers that piggy-backed."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
+
+
+preliminary_flights = SingleFlight()
+itinerary_flights = SingleFlight()
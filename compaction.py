@@ -0,0 +1,98 @@
+"""Compaction of Phase 1 outputs before they are handed to the itinerary agent."""
+import functools
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from budget import TransportCosts
+
+# Default token budget for each handoff into Phase 2.
+HANDOFF_TOKEN_BUDGET = int(os.environ.get("TRAVEL_PLANNER_HANDOFF_TOKENS", "600"))
+MAX_LINE_CHARS = 240
+
+# Serper result scaffolding that carries no facts of its own.
+NOISE_LINE = re.compile(r"^(link:\s*\S+|-{3,}|search results:?|title:\s*)$", re.IGNORECASE)
+JSON_BLOCK = re.compile(r"```(?:json)?\s*\{.*?\}\s*```", re.DOTALL)
+# Lines carrying prices, times, flight numbers, dates or list structure are the salient ones.
+SALIENT = [
+    re.compile(r"[$₹€£]\s?\d|\d\s?(usd|inr|eur|gbp)\b", re.IGNORECASE),
+    re.compile(r"\b[A-Z0-9]{2}\s?\d{2,4}\b"),
+    re.compile(r"\b\d{1,2}:\d{2}\b"),
+    re.compile(r"^\s*(\d+[.)]|[-*•]|#+)\s"),
+    re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b", re.IGNORECASE),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens as gpt-4o-mini counts them, or a chars/4 estimate without tiktoken."""
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def _clean_lines(text: str) -> List[str]:
+    """Drop search scaffolding and duplicates, and cap very long snippet lines."""
+    seen, lines = set(), []
+    for line in text.splitlines():
+        line = re.sub(r"^(search results:\s*)?(snippet|title):\s*", "", line.strip(), flags=re.IGNORECASE)
+        if not line or NOISE_LINE.match(line):
+            continue
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS].rsplit(" ", 1)[0] + "…"
+        key = re.sub(r"\W+", " ", line.casefold()).strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _fit(lines: List[str], max_tokens: int) -> str:
+    """Keep salient lines first, then the rest, in original order, within ``max_tokens``."""
+    ranked = sorted(range(len(lines)), key=lambda i: (not any(p.search(lines[i]) for p in SALIENT), i))
+    kept, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(lines[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        kept.add(i)
+        used += cost
+    return "\n".join(lines[i] for i in sorted(kept))
+
+
+def summarize_costs(costs: TransportCosts) -> List[str]:
+    basis = "per person" if costs.price_basis == "per_person" else f"total for {costs.travelers}"
+    lines = [f"Fares ({costs.currency}, {basis}):"]
+    for fare in sorted(costs.fares, key=lambda fare: fare.price):
+        details = " ".join(part for part in (fare.airline, fare.flight_number) if part)
+        times = " → ".join(part for part in (fare.departure, fare.arrival) if part)
+        lines.append(f"- {details or 'Fare'}{f' ({times})' if times else ''}: {fare.price:,.0f}")
+    return lines
+
+
+@dataclass
+class Handoff:
+    name: str
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+
+def compact_handoff(name: str, text: str, max_tokens: int = HANDOFF_TOKEN_BUDGET, costs: Optional[TransportCosts] = None) -> Handoff:
+    """Dedupe, trim and budget one Phase 1 output; a cost record becomes a short fare table."""
+    body = JSON_BLOCK.sub("", text) if costs is not None else text
+    summary = summarize_costs(costs) if costs is not None else []
+    compacted = "\n".join(summary + [_fit(_clean_lines(body), max_tokens - count_tokens("\n".join(summary)))]).strip()
+    return Handoff(name, compacted, count_tokens(text), count_tokens(compacted))
@@ -0,0 +1,125 @@
+"""Compare candidate destinations by running Phase 1 and the budget check for each in parallel."""
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional
+
+from fares import get_fare_store
+from governor import QueryLedger, RunGovernor, governed_run
+from normalize import canonical_city
+from planner import TripPlanner, currency_unit
+from resources import get_llm, get_research_cache, get_search_tool
+from semantic_cache import SEMANTIC_CACHE
+from tracing import span, start_trace
+
+# Destinations researched at once; each also runs its two Phase 1 tasks side by side.
+COMPARE_WORKERS = int(os.environ.get("TRAVEL_PLANNER_COMPARE_WORKERS", "3"))
+
+
+@dataclass
+class DestinationOption:
+    city: str
+    status: str
+    budget_check: Optional[dict] = None
+    costs: Optional[dict] = None
+    error: Optional[str] = None
+    # Phase 1 outputs in TripPlanner's memo format, so planning the chosen city reuses them.
+    memo: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def headroom(self) -> Optional[float]:
+        return self.budget_check["headroom"] if self.budget_check else None
+
+
+def rank_key(option: DestinationOption) -> tuple:
+    """Affordable first, then destinations with a known fare, then the cheapest."""
+    if option.status != "ok":
+        return (3, 0, 0, option.city)
+    check = option.budget_check
+    return (0 if check["sufficient"] else 1, check["transport_total"] is None, check["min_total"], option.city)
+
+
+def unique_cities(cities: List[str]) -> List[str]:
+    """Drop blanks and repeats, comparing names the way the destination guide does."""
+    seen, unique = set(), []
+    for city in cities:
+        key = canonical_city(city)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(city.strip())
+    return unique
+
+
+def format_comparison(options: List[DestinationOption], unit: str) -> str:
+    """Markdown cost table, ranked."""
+    lines = [
+        "| # | Destination | Flights | Stay | Minimum total | Headroom | Fits budget |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for rank, option in enumerate(sorted(options, key=rank_key), start=1):
+        if option.status != "ok":
+            lines.append(f"| {rank} | {option.city} | — | — | — | — | ⚠️ {option.error} |")
+            continue
+        check = option.budget_check
+        if check["transport_total"] is not None:
+            flights = f"{unit}{check['transport_total']:,.0f}"
+        elif check["transport_status"] == "currency_mismatch":
+            flights = f"unknown (quoted in {check['transport_currency']})"
+        else:
+            flights = "unknown"
+        lines.append(
+            f"| {rank} | {option.city} | {flights} | {unit}{check['stay_total']:,.0f} | "
+            f"{unit}{check['min_total']:,.0f} | {unit}{option.headroom:,.0f} | {'✅' if check['sufficient'] else '❌'} |"
+        )
+    return "\n".join(lines)
+
+
+def compare_destinations(
+    origin, cities, month, duration, people, budget, currency="USD",
+    openai_key=None, serper_key=None, llm=None, search_tool=None, verbose=False,
+    max_workers=COMPARE_WORKERS, on_result: Optional[Callable[[DestinationOption, list], None]] = None,
+) -> List[DestinationOption]:
+    """Research, price and budget-check each destination; return them ranked.
+
+    The itinerary phase is left out: pass the chosen option's ``memo`` to
+    ``plan_trip`` to write its plan without redoing Phase 1. ``on_result`` is
+    called on the calling thread with each finished option and all so far.
+    """
+    unit = currency_unit(currency)
+    # Built once and shared by every destination, along with their caches and connection pools.
+    llm = llm or get_llm(openai_key or os.environ["OPENAI_API_KEY"])
+    search_tool = search_tool or get_search_tool(serper_key or os.environ["SERPER_API_KEY"])
+
+    # Each destination gets its own caps, but exact repeats of one's searches (e.g. about the origin) serve the rest.
+    ledger = QueryLedger()
+    research_cache = get_research_cache(openai_key or os.environ.get("OPENAI_API_KEY")) if SEMANTIC_CACHE else None
+
+    def evaluate(city: str) -> DestinationOption:
+        option = DestinationOption(city, "ok")
+        with span("destination", city=city), governed_run(RunGovernor(ledger=ledger, places=(origin, city))):
+            try:
+                planner = TripPlanner(
+                    origin, city, month, duration, people, budget, unit, llm, search_tool,
+                    verbose=verbose, memo=option.memo, fare_store=get_fare_store(), research_cache=research_cache,
+                )
+                planner.run_preliminary()
+                check = planner.validate_budget()
+            except Exception as e:
+                option.status, option.error = "error", f"{type(e).__name__}: {e}"
+                return option
+        option.costs = planner.transport_costs.model_dump() if planner.transport_costs else None
+        option.budget_check = dict(asdict(check), headroom=budget - check.min_total)
+        return option
+
+    options = []
+    cities = unique_cities(cities)
+    with start_trace("compare_destinations", origin=origin, cities=", ".join(cities), month=month):
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Each destination runs in a copy of the caller's context so its spans nest under this trace.
+            futures = [pool.submit(contextvars.copy_context().run, evaluate, city) for city in cities]
+            for future in as_completed(futures):
+                options.append(future.result())
+                if on_result:
+                    on_result(options[-1], options)
+    return sorted(options, key=rank_key)
@@ -0,0 +1,122 @@
+"""Local destination guide: precomputed sights, seasonal weather and daily costs per city."""
+import difflib
+import functools
+import json
+import os
+from typing import Any, Optional, Type
+
+from crewai_tools import BaseTool
+from pydantic.v1 import BaseModel, Field
+
+from normalize import canonical_city, canonical_month
+from tracing import span
+
+DESTINATION_INDEX = os.environ.get("TRAVEL_PLANNER_DESTINATION_INDEX", os.path.join("data", "destinations.json"))
+# How close a typed city must be to an indexed name (or alias) to count as the same place.
+CITY_MATCH_CUTOFF = 0.85
+
+
+class DestinationIndex:
+    """Destination facts keyed by canonical city, then by month for the seasonal parts.
+
+    Each entry looks like::
+
+        {"name": "London", "aliases": ["LDN"], "sights": [...], "daily_costs": [...],
+         "months": {"june": {"weather": [...]}}}
+    """
+
+    def __init__(self, cities: Optional[dict] = None):
+        self.cities = cities or {}
+        self._names = {}
+        for key, entry in self.cities.items():
+            self._names[key] = key
+            for alias in entry.get("aliases", []):
+                self._names[canonical_city(alias)] = key
+
+    @classmethod
+    def load(cls, path: str = DESTINATION_INDEX) -> "DestinationIndex":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as index_file:
+            return cls(json.load(index_file)["cities"])
+
+    def save(self, path: str = DESTINATION_INDEX) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as index_file:
+            json.dump({"cities": self.cities}, index_file, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def add(self, city: str, entry: dict) -> None:
+        key = canonical_city(city)
+        self.cities[key] = entry
+        self._names[key] = key
+        for alias in entry.get("aliases", []):
+            self._names[canonical_city(alias)] = key
+
+    def match(self, city: str) -> Optional[str]:
+        """Index key for ``city``, tolerating case, accents, a trailing country or word, and small typos."""
+        name = canonical_city(city)
+        if name in self._names:
+            return self._names[name]
+        # "New York City" for "New York": the longest indexed name the input starts with.
+        prefixes = [known for known in self._names if name.startswith(known + " ")]
+        if prefixes:
+            return self._names[max(prefixes, key=len)]
+        close = difflib.get_close_matches(name, self._names, n=1, cutoff=CITY_MATCH_CUTOFF)
+        return self._names[close[0]] if close else None
+
+    def lookup(self, city: str, month: str) -> Optional[dict]:
+        key = self.match(city)
+        if key is None:
+            return None
+        entry = self.cities[key]
+        month_name = canonical_month(month)
+        return {
+            "name": entry.get("name", city),
+            "month": month_name,
+            "sights": entry.get("sights", []),
+            "daily_costs": entry.get("daily_costs", []),
+            "weather": entry.get("months", {}).get(month_name, {}).get("weather", []),
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_destination_index(path: str = DESTINATION_INDEX) -> DestinationIndex:
+    return DestinationIndex.load(path)
+
+
+def format_guide(facts: dict) -> str:
+    month = facts["month"].title() if facts["month"] else "any month"
+    lines = [f"Destination guide for {facts['name']} ({month}):", "Top sights:"]
+    lines += [f"- {sight}" for sight in facts["sights"]]
+    if facts["weather"]:
+        lines += [f"Weather in {month}:"] + [f"- {line}" for line in facts["weather"]]
+    if facts["daily_costs"]:
+        lines += ["Typical daily costs:"] + [f"- {line}" for line in facts["daily_costs"]]
+    return "\n".join(lines)
+
+
+class DestinationGuideSchema(BaseModel):
+    city: str = Field(..., description="Destination city, e.g. 'London'")
+    month: str = Field(..., description="Travel month, e.g. 'June 2026'")
+
+
+class DestinationGuideTool(BaseTool):
+    """Answers from the local destination index and searches the web only on a miss."""
+
+    name: str = "Destination guide"
+    description: str = (
+        "Top sights, seasonal weather and typical daily costs for a city in a given month. "
+        "Takes a city and a month."
+    )
+    args_schema: Type[BaseModel] = DestinationGuideSchema
+    index: Any = None
+    search_tool: Any = None
+
+    def _run(self, city: str, month: str, **kwargs: Any) -> Any:
+        index = self.index or get_destination_index()
+        with span("tool.destination_guide", **{"tool.city": city, "tool.month": month}) as guide_span:
+            facts = index.lookup(city, month)
+            guide_span.set(**{"index.hit": facts is not None})
+            if facts is not None and facts["sights"]:
+                return format_guide(facts)
+        return self.search_tool._run(search_query=f"top sights in {city} during {month}, weather and daily costs")
@@ -0,0 +1,138 @@
+"""Local time series of the flight fares the transport task has found, per route and month."""
+import os
+import threading
+import time
+from typing import Optional, Sequence
+
+from budget import FareOption, TransportCosts
+from normalize import MONTHS, canonical_city, canonical_month, canonical_travel_month
+from search_cache import CACHE_DIR
+from shared import shared_resource
+from sqlite_store import connect
+
+# Observations younger than this answer the transport step without a search; 0 always searches.
+FARE_MAX_AGE = float(os.environ.get("TRAVEL_PLANNER_FARE_MAX_AGE", str(6 * 3600)))
+# Distinct flights needed before the store is trusted over a fresh search.
+MIN_FARE_OBSERVATIONS = int(os.environ.get("TRAVEL_PLANNER_MIN_FARE_OBSERVATIONS", "2"))
+FARE_RETENTION = 90 * 24 * 3600
+
+
+def fare_month(month: str, now: Optional[float] = None) -> Optional[str]:
+    """Month and year fares are kept under ("june 2027"); a bare month is its next occurrence, None if none parses."""
+    name = canonical_month(month)
+    if name is None:
+        return None
+    travel_month = canonical_travel_month(month)
+    if travel_month != name:
+        return travel_month
+    today = time.localtime(now)
+    return f"{name} {today.tm_year + (MONTHS.index(name) + 1 < today.tm_mon)}"
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of already-sorted values."""
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class FareStore:
+    """SQLite-backed fare observations, one row per fare, priced per person."""
+
+    def __init__(self, path: str, retention: float = FARE_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+
+        self._conn = connect(
+            path,
+            "CREATE TABLE IF NOT EXISTS fares ("
+            "origin TEXT, city TEXT, month TEXT, currency TEXT, airline TEXT, flight_number TEXT, "
+            "departure TEXT, arrival TEXT, price REAL, observed_at REAL)",
+            "CREATE INDEX IF NOT EXISTS fares_route ON fares (origin, city, month, currency, observed_at)",
+        )
+
+    @staticmethod
+    def _route(origin: str, city: str, month: str, currency: str) -> Optional[tuple]:
+        travel_month = fare_month(month)
+        if travel_month is None:
+            return None
+        return canonical_city(origin), canonical_city(city), travel_month, currency.upper()
+
+    def record(self, origin: str, city: str, month: str, costs: TransportCosts, observed_at: Optional[float] = None) -> None:
+        """Store each fare per person; skipped when the month doesn't parse, since it couldn't be looked up again."""
+        route = self._route(origin, city, month, costs.currency)
+        if route is None:
+            return
+        now = observed_at or time.time()
+        per_person = costs.travelers if costs.price_basis == "total" else 1
+        rows = [
+            (*route, fare.airline, fare.flight_number,
+             fare.departure, fare.arrival, fare.price / per_person, now)
+            for fare in costs.fares
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT INTO fares VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("DELETE FROM fares WHERE observed_at < ?", (now - self.retention,))
+            self._conn.commit()
+
+    def _rows(self, origin: str, city: str, month: str, currency: str, max_age: float) -> list:
+        route = self._route(origin, city, month, currency)
+        if route is None:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT airline, flight_number, departure, arrival, price, observed_at FROM fares "
+                "WHERE origin = ? AND city = ? AND month = ? AND currency = ? AND observed_at >= ? "
+                "ORDER BY observed_at DESC",
+                (*route, time.time() - max_age),
+            ).fetchall()
+
+    def percentiles(self, origin: str, city: str, month: str, currency: str, max_age: float = FARE_RETENTION, qs=(10, 50, 90)) -> Optional[dict]:
+        """Per-person fare percentiles for the route and month, or None without observations."""
+        prices = sorted(row[4] for row in self._rows(origin, city, month, currency, max_age))
+        if not prices:
+            return None
+        return {"count": len(prices), "min": prices[0], **{f"p{q}": percentile(prices, q) for q in qs}}
+
+    def recent(self, origin: str, city: str, month: str, currency: str, max_age: float = FARE_MAX_AGE, min_flights: int = MIN_FARE_OBSERVATIONS) -> Optional[TransportCosts]:
+        """The latest fare per flight seen within ``max_age``, if enough distinct flights were seen."""
+        if max_age <= 0:
+            return None
+        latest = {}
+        for airline, flight_number, departure, arrival, price, _ in self._rows(origin, city, month, currency, max_age):
+            latest.setdefault((airline, flight_number), FareOption(
+                airline=airline, flight_number=flight_number, departure=departure, arrival=arrival, price=price,
+            ))
+        if len(latest) < min_flights:
+            return None
+        fares = sorted(latest.values(), key=lambda fare: fare.price)
+        return TransportCosts(currency=currency.upper(), price_basis="per_person", travelers=1, fares=fares)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, routes = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT origin || '|' || city || '|' || month) FROM fares"
+            ).fetchone()
+        return {"observations": count, "routes": routes}
+
+
+def format_fare_estimate(origin: str, city: str, month: str, costs: TransportCosts, spread: dict, unit: str) -> str:
+    """Transport task answer built from stored fares, in the shape the agent would have written."""
+    lines = [
+        f"Recent fares from {origin} to {city} for {month}, per person "
+        f"(from {spread['count']} observations: median {unit}{spread['p50']:,.0f}, "
+        f"10th-90th percentile {unit}{spread['p10']:,.0f}-{unit}{spread['p90']:,.0f}):"
+    ]
+    for number, fare in enumerate(costs.fares, start=1):
+        times = f", departs {fare.departure}, arrives {fare.arrival}" if fare.departure and fare.arrival else ""
+        lines.append(f"{number}. {fare.airline or 'Unknown airline'} {fare.flight_number or ''}{times}, {unit}{fare.price:,.0f} per person.")
+    lines += ["```json", costs.model_dump_json(), "```"]
+    return "\n".join(lines)
+
+
+@shared_resource
+def get_fare_store() -> FareStore:
+    """Process-wide fare store shared by every planning run."""
+    return FareStore(os.path.join(CACHE_DIR, "fares.sqlite"))
@@ -0,0 +1,202 @@
+"""Per-run limits on agent tool calls, iterations and wall time, plus a shared query ledger."""
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from normalize import normalize_text
+from tracing import current_span
+
+MAX_ITER_PER_AGENT = int(os.environ.get("TRAVEL_PLANNER_MAX_ITER_PER_AGENT", "8"))
+MAX_ITER_PER_RUN = int(os.environ.get("TRAVEL_PLANNER_MAX_ITER_PER_RUN", "20"))
+MAX_TOOL_CALLS_PER_AGENT = int(os.environ.get("TRAVEL_PLANNER_MAX_TOOL_CALLS_PER_AGENT", "4"))
+MAX_TOOL_CALLS_PER_RUN = int(os.environ.get("TRAVEL_PLANNER_MAX_TOOL_CALLS_PER_RUN", "10"))
+# Seconds a whole run may take; agents still going are told to wrap up, then stopped.
+RUN_DEADLINE = float(os.environ.get("TRAVEL_PLANNER_RUN_DEADLINE", "300"))
+# Word overlap (Jaccard) above which two queries in the same run count as the same search.
+NEAR_DUPLICATE = 0.8
+STOPWORDS = {"a", "an", "and", "at", "best", "during", "for", "from", "in", "of", "on", "the", "to", "top"}
+
+LIMIT_MESSAGE = (
+    "Search limit reached for this run. Do not search again; "
+    "give your final answer with the information you already have."
+)
+
+_current_governor = contextvars.ContextVar("current_governor", default=None)
+_current_agent = contextvars.ContextVar("current_agent", default=None)
+
+
+def query_key(query: str) -> str:
+    """Case-folded words of ``query`` in their original order, without punctuation."""
+    return " ".join(re.sub(r"[^\w\s]", " ", normalize_text(query)).split())
+
+
+def query_words(query: str) -> frozenset:
+    return frozenset(word for word in query_key(query).split() if word not in STOPWORDS)
+
+
+def place_names(places: tuple) -> tuple:
+    """Place names as ``place_order`` looks for them: the part before any comma, as query words."""
+    return tuple(query_key(place.split(",")[0]) for place in places if place)
+
+
+def place_order(query: str, places: tuple) -> tuple:
+    """Those of ``places`` that ``query`` names, in the order it names them."""
+    text = f" {query_key(query)} "
+    found = [(text.find(f" {place} "), place) for place in places if f" {place} " in text]
+    return tuple(place for _, place in sorted(found))
+
+
+class QueryLedger:
+    """Results of the searches made so far.
+
+    An exact repeat of a query (same words in the same order) is answered for
+    any run. Near-duplicates by word overlap only answer the run ``places`` that
+    recorded them, and only if they name those places in the same order, so
+    "flights from A to B" never answers "flights from B to A" and one
+    destination's fares never answer another's.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE):
+        self.threshold = threshold
+        self._exact = {}
+        self._similar = []
+        self._lock = threading.Lock()
+
+    def lookup(self, query: str, places: tuple = ()) -> Optional[Any]:
+        key, words = query_key(query), query_words(query)
+        order = place_order(query, places)
+        with self._lock:
+            if key in self._exact:
+                return self._exact[key]
+            if not places or not words:
+                return None
+            for known_places, known_order, known, result in self._similar:
+                if (
+                    known_places == places and known_order == order
+                    and len(words & known) / len(words | known) >= self.threshold
+                ):
+                    return result
+        return None
+
+    def record(self, query: str, result: Any, places: tuple = ()) -> None:
+        with self._lock:
+            self._exact[query_key(query)] = result
+            if places:
+                self._similar.append((places, place_order(query, places), query_words(query), result))
+
+
+class RunGovernor:
+    """Caps tool calls and reasoning iterations per agent and per run, under one deadline.
+
+    Pass one ``ledger`` to several governors to let their runs reuse each other's searches.
+    ``places`` (e.g. origin and destination) let the run reuse near-duplicate searches of its own.
+    """
+
+    def __init__(
+        self, max_iter_per_agent: int = MAX_ITER_PER_AGENT, max_iter_per_run: int = MAX_ITER_PER_RUN,
+        max_tool_calls_per_agent: int = MAX_TOOL_CALLS_PER_AGENT, max_tool_calls_per_run: int = MAX_TOOL_CALLS_PER_RUN,
+        deadline: float = RUN_DEADLINE, ledger: Optional[QueryLedger] = None, places: tuple = (),
+    ):
+        self.max_iter_per_agent = max_iter_per_agent
+        self.max_iter_per_run = max_iter_per_run
+        self.max_tool_calls_per_agent = max_tool_calls_per_agent
+        self.max_tool_calls_per_run = max_tool_calls_per_run
+        self.deadline = time.monotonic() + deadline
+        self.ledger = ledger or QueryLedger()
+        self.places = place_names(places)
+        self.tool_calls = Counter()
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def prepare(self, agent: Any) -> None:
+        """Bound ``agent``'s next task by what is left of the run's iterations and time."""
+        with self._lock:
+            iterations_left = self.max_iter_per_run - self.counts["iterations"]
+        # crewAI asks for a final answer two iterations before max_iter, so keep room for it.
+        agent.max_iter = max(2, min(self.max_iter_per_agent, iterations_left))
+        agent.max_execution_time = max(1, int(self.remaining()))
+
+    def finish(self, agent: Any) -> None:
+        executor = getattr(agent, "agent_executor", None)
+        with self._lock:
+            self.counts["iterations"] += getattr(executor, "iterations", 0)
+
+    def _allow_tool_call(self, agent: Optional[str]) -> bool:
+        with self._lock:
+            if (
+                self.remaining() <= 0
+                or sum(self.tool_calls.values()) >= self.max_tool_calls_per_run
+                or self.tool_calls[agent] >= self.max_tool_calls_per_agent
+            ):
+                self.counts["limited"] += 1
+                return False
+            self.tool_calls[agent] += 1
+            return True
+
+    def search(self, query: str, fn: Callable[[], Any]) -> Any:
+        """Answer a repeated or near-duplicate query from the ledger, else search within the caps."""
+        earlier = self.ledger.lookup(query, self.places)
+        current_span().set(**{"ledger.hit": earlier is not None})
+        if earlier is not None:
+            with self._lock:
+                self.counts["deduplicated"] += 1
+            return earlier
+        if not self._allow_tool_call(_current_agent.get()):
+            current_span().set(**{"governor.limited": True})
+            return LIMIT_MESSAGE
+        result = fn()
+        # Like the search cache, keep formatted results only, not error payloads.
+        if isinstance(result, str):
+            self.ledger.record(query, result, self.places)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tool_calls": sum(self.tool_calls.values()),
+                "deduplicated": self.counts["deduplicated"],
+                "limited": self.counts["limited"],
+                "iterations": self.counts["iterations"],
+            }
+
+
+def current_governor() -> Optional[RunGovernor]:
+    return _current_governor.get()
+
+
+@contextmanager
+def governed_run(governor: RunGovernor):
+    """Make ``governor`` apply to everything run in this context, including worker threads copied from it."""
+    token = _current_governor.set(governor)
+    try:
+        yield governor
+    finally:
+        _current_governor.reset(token)
+
+
+@contextmanager
+def agent_scope(agent: Any):
+    """Run one agent's task under the current governor, if there is one."""
+    governor = current_governor()
+    token = _current_agent.set(getattr(agent, "role", None))
+    if governor is not None:
+        governor.prepare(agent)
+    try:
+        yield
+    finally:
+        if governor is not None:
+            governor.finish(agent)
+        _current_agent.reset(token)
+
+
+def governed_search(query: str, fn: Callable[[], Any]) -> Any:
+    governor = current_governor()
+    return governor.search(query, fn) if governor is not None else fn()
@@ -0,0 +1,115 @@
+"""Background planning jobs that outlive Streamlit reruns."""
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+JOB_WORKERS = int(os.environ.get("TRAVEL_PLANNER_JOB_WORKERS", "4"))
+# Jobs waiting or running at once, across all sessions; submissions beyond it are refused.
+MAX_PENDING_JOBS = int(os.environ.get("TRAVEL_PLANNER_MAX_PENDING_JOBS", str(JOB_WORKERS * 4)))
+# Finished jobs nobody collected (e.g. the browser tab was closed) are dropped after this many seconds.
+JOB_RESULT_TTL = float(os.environ.get("TRAVEL_PLANNER_JOB_RESULT_TTL", "3600"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    job_id: str
+    status: str = QUEUED
+    message: str = "Waiting for a free planner…"
+    progress: float = 0.0
+    # Text streamed so far, e.g. the itinerary while the LLM is still writing it.
+    partial: Optional[str] = None
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def update(self, message: Optional[str] = None, progress: Optional[float] = None, partial: Optional[str] = None) -> None:
+        """Report progress from inside the job; the page picks it up on its next poll."""
+        if message is not None:
+            self.message = message
+        if progress is not None:
+            self.progress = progress
+        if partial is not None:
+            self.partial = partial
+
+
+class JobQueue:
+    """Runs jobs on a bounded worker pool and keeps their results until collected.
+
+    ``fn`` gets the :class:`Job` as its first argument so it can call
+    ``job.update`` as it goes.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, max_pending: int = MAX_PENDING_JOBS, result_ttl: float = JOB_RESULT_TTL):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plan-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> str:
+        with self._lock:
+            self._expire()
+            if sum(not job.done for job in self._jobs.values()) >= self.max_pending:
+                raise JobQueueFull("The planner is at capacity; please try again shortly.")
+            job = Job(secrets.token_hex(8))
+            self._jobs[job.job_id] = job
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.job_id
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        job.status, job.started = RUNNING, time.time()
+        job.message = "Starting…"
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status, job.progress = DONE, 1.0
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def collect(self, job_id: str) -> Optional[Job]:
+        """Hand over a finished job and forget it; unfinished jobs stay queued."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done:
+                del self._jobs[job_id]
+            return job
+
+    def position(self, job_id: str) -> int:
+        """How many queued jobs were submitted ahead of this one."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            return sum(other.status == QUEUED and other.created < job.created for other in self._jobs.values())
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (QUEUED, RUNNING, DONE, FAILED)}
@@ -0,0 +1,129 @@
+"""Exact-match completion cache for the chat models driving the agents."""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from search_cache import CACHE_DIR
+from shared import shared_resource
+from sqlite_store import connect, evict_lru
+
+# Model parameters that change the completion; everything else in the llm_string
+# (clients, retry counts, streaming, the cache itself) is transport detail.
+KEY_PARAMS = (
+    "model_name", "model", "temperature", "n", "max_tokens", "top_p",
+    "frequency_penalty", "presence_penalty", "seed", "model_kwargs",
+)
+
+
+def completion_key(prompt: str, llm_string: str) -> str:
+    """Hash of the model settings plus the full serialized prompt/messages."""
+    serialized, _, call_params = llm_string.rpartition("---")
+    try:
+        kwargs = json.loads(serialized)["kwargs"]
+        settings = {name: kwargs[name] for name in KEY_PARAMS if name in kwargs}
+        model_part = json.dumps(settings, sort_keys=True) + call_params
+    except (ValueError, KeyError, TypeError):
+        model_part = llm_string
+    return hashlib.sha256(f"{model_part}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class TieredLLMCache(BaseCache):
+    """In-memory LRU tier in front of an optional size-capped SQLite tier."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_items: int = 256,
+        max_entries: int = 10000,
+        max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            self._conn = connect(
+                path,
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT, size INTEGER, created_at REAL, last_access REAL)",
+            )
+
+    def __repr__(self) -> str:
+        return f"TieredLLMCache(path={self.path!r})"
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = completion_key(prompt, llm_string)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+                    value = [loads(generation) for generation in json.loads(row[0])]
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = completion_key(prompt, llm_string)
+        with self._lock:
+            self._remember(key, return_val)
+            if self._conn is None:
+                return
+            payload = json.dumps([dumps(generation) for generation in return_val])
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            evict_lru(self._conn, "completions", self.max_entries, self.max_bytes)
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM completions")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+@shared_resource
+def get_completion_cache() -> TieredLLMCache:
+    """Process-wide completion cache handed to every ChatOpenAI the planner builds."""
+    return TieredLLMCache(os.path.join(CACHE_DIR, "llm_cache.sqlite"))
@@ -0,0 +1,68 @@
+"""Normalization of user-typed trip inputs into comparable keys."""
+import calendar
+import math
+import re
+import unicodedata
+from typing import Any, Optional
+
+MONTHS = [name.lower() for name in calendar.month_name[1:]]
+
+
+def normalize_text(value: Any) -> str:
+    """Case-fold, trim and collapse whitespace; numbers pass through as their canonical string."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = re.sub(r"\s+", " ", str(value)).strip().casefold()
+    return text.strip(" .,;")
+
+
+def trip_key(**fields: Any) -> tuple:
+    """Order-independent key over the given trip fields."""
+    return tuple((name, normalize_text(value)) for name, value in sorted(fields.items()))
+
+
+def canonical_city(value: Any) -> str:
+    """City name without accents, punctuation or a trailing region: "Zürich, CH" -> "zurich"."""
+    text = unicodedata.normalize("NFKD", normalize_text(value).split(",")[0])
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^\w]+", " ", text).strip()
+
+
+def canonical_month(value: Any) -> Optional[str]:
+    """Full month name from "June 2026", "3 jun" or "06"; None if there isn't one.
+
+    Month names win over numbers, so a day ("3 June") is never read as the month;
+    a bare 1-12 only counts when no word names a month.
+    """
+    tokens = re.findall(r"[a-z]+|\d+", normalize_text(value))
+    for token in tokens:
+        if token.isalpha() and len(token) >= 3:
+            for month in MONTHS:
+                if month.startswith(token):
+                    return month
+    for token in tokens:
+        if token.isdigit() and len(token) <= 2 and 1 <= int(token) <= 12:
+            return MONTHS[int(token) - 1]
+    return None
+
+
+def canonical_travel_month(value: Any) -> str:
+    """Month plus year when one is given ("june 2026"), else just the month; falls back to the text."""
+    month = canonical_month(value)
+    if month is None:
+        return normalize_text(value)
+    year = re.search(r"\b(19|20)\d{2}\b", normalize_text(value))
+    return f"{month} {year.group(0)}" if year else month
+
+
+def budget_bucket(budget: Any, width: float = 0.1) -> int:
+    """Budgets within about ``width`` of each other share a bucket (geometric steps)."""
+    return round(math.log(max(float(budget), 1.0)) / math.log(1 + width))
+
+
+def plan_key(origin, city, month, duration, people, budget, currency) -> tuple:
+    """Key under which equivalent whole-plan requests are stored."""
+    return (
+        canonical_city(origin), canonical_city(city), canonical_travel_month(month),
+        int(duration), int(people), budget_bucket(budget), normalize_text(currency),
+    )
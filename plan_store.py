@@ -0,0 +1,91 @@
+"""Compressed on-disk store of finished plans, keyed by normalized trip inputs."""
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Optional
+
+from search_cache import CACHE_DIR
+from shared import shared_resource
+from sqlite_store import connect, evict_lru
+
+# Stored plans quote fares, so they go stale about as fast as flight searches; 0 disables the store.
+PLAN_TTL = float(os.environ.get("TRAVEL_PLANNER_PLAN_TTL", str(24 * 3600)))
+
+
+class PlanStore:
+    """SQLite-backed whole-plan store with a TTL and LRU size eviction; values are zlib-compressed JSON."""
+
+    def __init__(self, path: str, ttl: float = PLAN_TTL, max_entries: int = 2000, max_bytes: int = 20 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = connect(
+            path,
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "key TEXT PRIMARY KEY, value BLOB, size INTEGER, created_at REAL, last_access REAL)",
+        )
+
+    @staticmethod
+    def _key(key: tuple) -> str:
+        return json.dumps(key, ensure_ascii=False)
+
+    def get(self, key: tuple) -> Optional[dict]:
+        """The stored plan record with its ``created_at`` time, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM plans WHERE key = ?", (self._key(key),)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM plans WHERE key = ?", (self._key(key),))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE plans SET last_access = ? WHERE key = ?", (now, self._key(key)))
+            self._conn.commit()
+            self.hits += 1
+        return dict(json.loads(zlib.decompress(row[0])), created_at=row[1])
+
+    def set(self, key: tuple, record: dict) -> None:
+        payload = zlib.compress(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?)",
+                (self._key(key), payload, len(payload), now, now),
+            )
+            self._conn.execute("DELETE FROM plans WHERE created_at < ?", (now - self.ttl,))
+            evict_lru(self._conn, "plans", self.max_entries, self.max_bytes)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM plans")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM plans").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+        }
+
+
+@shared_resource
+def get_plan_store() -> PlanStore:
+    """Process-wide plan store shared by every planning run."""
+    return PlanStore(os.path.join(CACHE_DIR, "plans.sqlite"))
@@ -0,0 +1,493 @@
+"""Headless planning pipeline: Phase 1 research, budget check, Phase 2 itinerary."""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Optional
+
+from crewai import Task
+from langchain_core.callbacks import BaseCallbackHandler
+
+from agents import build_agent
+from destinations import DestinationGuideTool
+from fares import FARE_MAX_AGE, format_fare_estimate, get_fare_store
+from governor import RunGovernor, governed_run
+from compaction import HANDOFF_TOKEN_BUDGET, compact_handoff
+from coalesce import COALESCE_ITINERARY, COALESCE_PRELIMINARY, itinerary_flights, preliminary_flights
+from budget import CURRENCY_CODES, TRANSPORT_COSTS_FORMAT, BudgetCheck, check_budget, parse_transport_costs
+from resources import get_llm, get_research_cache, get_search_tool
+from normalize import canonical_city, canonical_month, normalize_text, plan_key, trip_key
+from plan_store import PLAN_TTL, get_plan_store
+from semantic_cache import SEMANTIC_CACHE
+from task_scheduler import TaskScheduler, set_task_output
+from tracing import record_agent_step, span, start_trace
+
+CURRENCY_UNITS = {code: unit for unit, code in CURRENCY_CODES.items()}
+
+# Start the itinerary while the budget check runs and throw it away if the budget falls short.
+SPECULATIVE_ITINERARY = os.environ.get("TRAVEL_PLANNER_SPECULATIVE_ITINERARY", "0") == "1"
+SPECULATION_STATS = {"drafts": 0, "kept": 0, "cancelled": 0, "saved_seconds": 0.0, "wasted_tokens": 0}
+_speculation_lock = threading.Lock()
+_speculation_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative-itinerary")
+# The cancel flag of the speculative draft running in this context, if any.
+_current_draft = contextvars.ContextVar("current_draft", default=None)
+
+# Trip fields each Phase 1 task's prompt is built from. A stored output stays
+# valid while these match, so changing duration, people or budget reuses both.
+PRELIMINARY_INPUTS = {
+    "research": ("city", "month"),
+    "transport": ("origin", "city", "month", "unit"),
+}
+
+
+def currency_unit(currency: str) -> str:
+    """Accept either a code ("USD") or a display unit ("$") and return the unit."""
+    if currency in CURRENCY_CODES:
+        return currency
+    return CURRENCY_UNITS[currency.upper()]
+
+
+class SpeculationCancelled(Exception):
+    """Raised inside a speculative itinerary run once the budget check has failed."""
+
+
+class DraftCancelHandler(BaseCallbackHandler):
+    """Stops a cancelled draft's LLM calls as they start or mid-stream, instead of at the agent's next step."""
+
+    raise_error = True
+
+    def _check(self) -> None:
+        cancelled = _current_draft.get()
+        if cancelled is not None and cancelled.is_set():
+            raise SpeculationCancelled("budget check failed")
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self._check()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self._check()
+
+
+DRAFT_CANCEL_HANDLER = DraftCancelHandler()
+
+
+def record_speculation(**counts: float) -> None:
+    with _speculation_lock:
+        for name, value in counts.items():
+            SPECULATION_STATS[name] += value
+
+
+def output_text(output: Any) -> str:
+    if hasattr(output, "raw"):
+        return output.raw
+    return str(output)
+
+
+class TripPlanner:
+    """Agents and tasks for one trip request, run one phase at a time."""
+
+    def __init__(
+        self, origin, city, month, duration, people, budget, unit, llm, search_tool, planner_llm=None, verbose=True,
+        coalesce_preliminary=COALESCE_PRELIMINARY, coalesce_itinerary=COALESCE_ITINERARY, memo=None,
+        handoff_tokens=HANDOFF_TOKEN_BUDGET, destination_index=None, speculative=SPECULATIVE_ITINERARY,
+        fare_store=None, research_cache=None,
+    ):
+        self.origin = origin
+        self.city = city
+        self.month = month
+        self.duration = duration
+        self.people = people
+        self.budget = budget
+        self.unit = unit
+        self.scheduler = TaskScheduler(max_workers=2)
+        self.transport_costs = None
+        self.coalesce_preliminary = coalesce_preliminary
+        self.coalesce_itinerary = coalesce_itinerary
+        # Phase 1 outputs from earlier runs (e.g. one browser session), as {task name: (input key, output)}.
+        self.memo = memo
+        self.reused = []
+        # Recorded fares answer the transport task when recent enough; None always searches.
+        self.fare_store = fare_store
+        self.fare_estimate = None
+        # Research for a similar enough earlier request (see semantic_cache) answers the research task.
+        self.research_cache = research_cache
+        self.research_match = None
+        self.handoff_tokens = handoff_tokens
+        self.handoffs = []
+        self.speculative = speculative
+        self.speculation = {}
+        self._draft_cancelled = threading.Event()
+        self._draft_started = None
+        self._itinerary_span = None
+
+        # --- AGENTS ---
+        itinerary_llm = planner_llm or llm
+        if speculative:
+            # A shallow copy for this request: the shared client and its connection pool are left untouched.
+            callbacks = [*(itinerary_llm.callbacks or []), DRAFT_CANCEL_HANDLER]
+            itinerary_llm = itinerary_llm.copy(update={"callbacks": callbacks})
+        trip = dict(origin=origin, city=city, month=month, duration=duration, people=people)
+        # The researcher reads the local destination guide, which searches only for cities it doesn't know.
+        guide = DestinationGuideTool(index=destination_index, search_tool=search_tool)
+        self.researcher = build_agent("researcher", llm, [guide], verbose=verbose, **trip)
+        self.transporter = build_agent("transporter", llm, [search_tool], verbose=verbose, **trip)
+        self.logistics_pro = build_agent(
+            "logistics_pro", itinerary_llm, [search_tool], verbose=verbose,
+            step_callback=self._itinerary_step, **trip
+        )
+
+        # --- PHASE 1: PRELIMINARY DATA ---
+        self.research_task = Task(
+            description=f"Identify top 5 sights in {city} during {month}, noting which suit groups.",
+            expected_output="A report on destination highlights.",
+            agent=self.researcher
+        )
+
+        self.transport_task = Task(
+            description=(
+                f"Find flight options from {origin} to {city} for travel in {month}. "
+                f"Provide the fare PER PERSON in {unit}.\n"
+                "- Include Airline, Flight Number, and Times.\n"
+                f"- Quote prices in {CURRENCY_CODES[unit]}.\n"
+                f"{TRANSPORT_COSTS_FORMAT}"
+            ),
+            expected_output=f"A list containing flight details and per-person fares in {unit}, followed by the JSON cost record.",
+            agent=self.transporter
+        )
+
+        # --- PHASE 2: FINAL PLANNING ---
+        self.itinerary_task = Task(
+            description=(
+                f"Create a {duration}-day itinerary for {people} people in {city}. \n"
+                "MANDATORY:\n"
+                f"1. Include 'Travel Logistics' at the top with total flight costs (per-person fare x {people}).\n"
+                "2. Provide the daily itinerary.\n"
+                "3. AT THE VERY END, provide a '💰 Group Cost Summary' table with: \n"
+                "- Total Flight Cost\n"
+                "- Estimated Total Hotel/Food Cost\n"
+                "- Total Trip Cost\n"
+                "- COST PER PERSON."
+            ),
+            expected_output=f"A {duration}-day Markdown plan for {people} people in {unit} including a cost-split table.",
+            agent=self.logistics_pro,
+            # The itinerary's context joins both Phase 1 tasks.
+            context=[self.research_task, self.transport_task]
+        )
+
+    def preliminary_key(self, name: str) -> tuple:
+        """Key over the inputs that feed one Phase 1 task."""
+        return trip_key(**{field: getattr(self, field) for field in PRELIMINARY_INPUTS[name]})
+
+    def itinerary_key(self) -> tuple:
+        return trip_key(
+            origin=self.origin, city=self.city, month=self.month, duration=self.duration,
+            people=self.people, budget=self.budget, unit=self.unit,
+        )
+
+    def run_preliminary(self):
+        """Phase 1: rerun only the tasks whose inputs changed since the memoized run.
+
+        Tasks that do run are attached to an identical in-flight run when there is one.
+        """
+        tasks = {"research": self.research_task, "transport": self.transport_task}
+        outputs, stale = {}, {}
+        for name, task in tasks.items():
+            key = self.preliminary_key(name)
+            stored = self.memo.get(name) if self.memo is not None else None
+            if stored is not None and stored[0] == key:
+                # The itinerary's context reads these tasks' outputs, so fill them in.
+                set_task_output(task, stored[1])
+                outputs[name] = stored[1]
+            else:
+                stale[name] = key
+        self.reused = [name for name in tasks if name not in stale]
+        if "research" in stale and self.research_cache is not None:
+            match = self.match_research()
+            if match is not None:
+                outputs["research"] = match
+                key = stale.pop("research")
+                if self.memo is not None:
+                    self.memo["research"] = (key, match)
+        if "transport" in stale and self.fare_store is not None:
+            estimate = self.estimate_transport()
+            if estimate is not None:
+                outputs["transport"] = estimate
+                key = stale.pop("transport")
+                if self.memo is not None:
+                    self.memo["transport"] = (key, estimate)
+
+        with span(
+            "phase.preliminary", reused=",".join(self.reused), fare_store=self.fare_estimate is not None,
+            semantic_cache=self.research_match is not None,
+        ) as phase_span:
+            if stale:
+                # Research and transport are independent, so they run side by side.
+                def run_stale():
+                    return dict(zip(stale, self.scheduler.run([tasks[name] for name in stale])))
+
+                if self.coalesce_preliminary:
+                    fresh, shared = preliminary_flights.do(tuple(sorted(stale.items())), run_stale)
+                else:
+                    fresh, shared = run_stale(), False
+                for name, text in fresh.items():
+                    if shared:
+                        set_task_output(tasks[name], text)
+                    if self.memo is not None:
+                        self.memo[name] = (stale[name], text)
+                outputs.update(fresh)
+                phase_span.set(coalesced=shared)
+                if "research" in stale and not shared and self.research_cache is not None:
+                    self.research_cache.add(self.research_query(), fresh["research"], canonical_month(self.month))
+            self.transport_costs = parse_transport_costs(outputs["transport"])
+            # Only the run that actually searched records, so coalesced followers don't count a fare twice.
+            if "transport" in stale and not shared and self.transport_costs and self.fare_store is not None:
+                self.fare_store.record(self.origin, self.city, self.month, self.transport_costs)
+        return outputs["research"], outputs["transport"]
+
+    def research_query(self) -> str:
+        """The research task's only inputs, canonicalized, as the text its similarity is judged on.
+
+        "London, UK" in "Jun 2026" and "london" in "June" embed the same text.
+        """
+        return f"{canonical_city(self.city)}, {canonical_month(self.month) or normalize_text(self.month)}"
+
+    def match_research(self) -> Optional[str]:
+        """Answer the research task from research done for a similar request, skipping its agent loop."""
+        match = self.research_cache.lookup(self.research_query(), canonical_month(self.month))
+        if match is None:
+            return None
+        self.research_match = {"request": match["text"], "similarity": match["similarity"]}
+        set_task_output(self.research_task, match["value"])
+        return match["value"]
+
+    def estimate_transport(self) -> Optional[str]:
+        """Answer the transport task from recently recorded fares, skipping its search loop."""
+        currency = CURRENCY_CODES[self.unit]
+        costs = self.fare_store.recent(self.origin, self.city, self.month, currency, max_age=FARE_MAX_AGE)
+        if costs is None:
+            return None
+        # The same window as the fares used, so the page's "recently seen" count and median describe them.
+        self.fare_estimate = self.fare_store.percentiles(self.origin, self.city, self.month, currency, max_age=FARE_MAX_AGE)
+        text = format_fare_estimate(self.origin, self.city, self.month, costs, self.fare_estimate, self.unit)
+        set_task_output(self.transport_task, text)
+        return text
+
+    def validate_budget(self) -> BudgetCheck:
+        with span("phase.budget_check") as check_span:
+            budget_check = check_budget(self.transport_costs, self.budget, self.duration, self.people, self.unit)
+            check_span.set(sufficient=budget_check.sufficient, min_total=budget_check.min_total)
+        return budget_check
+
+    def _run_itinerary_task(self) -> str:
+        final_plan, = self.scheduler.run([self.itinerary_task])
+        return output_text(final_plan)
+
+    def compact_handoffs(self) -> None:
+        """Swap the Phase 1 outputs the itinerary reads for compacted, token-budgeted versions."""
+        self.handoffs = [
+            compact_handoff("research", self.research_task.output.raw_output, self.handoff_tokens),
+            compact_handoff("transport", self.transport_task.output.raw_output, self.handoff_tokens, self.transport_costs),
+        ]
+        for task, handoff in zip((self.research_task, self.transport_task), self.handoffs):
+            set_task_output(task, handoff.text)
+
+    def _itinerary_step(self, step: Any) -> None:
+        record_agent_step(step)
+        self._check_draft()
+
+    def _check_draft(self) -> None:
+        # Only a speculative draft's context carries the flag; it stops at the next check once the budget fails.
+        if _current_draft.get() is not None and self._draft_cancelled.is_set():
+            raise SpeculationCancelled("budget check failed")
+
+    def start_itinerary(self) -> Future:
+        """Begin Phase 2 on a background thread before the budget check has decided.
+
+        Follow with :meth:`keep_itinerary` or :meth:`cancel_itinerary`.
+        """
+        self._draft_cancelled.clear()
+        self._draft_started = time.perf_counter()
+        record_speculation(drafts=1)
+        # The draft runs in a copy of the caller's context so its spans nest under the caller's.
+        return _speculation_pool.submit(contextvars.copy_context().run, self.run_itinerary, True)
+
+    def keep_itinerary(self, draft: Future) -> str:
+        # Without speculation the itinerary would only be starting now.
+        saved = time.perf_counter() - self._draft_started
+        self.speculation = {"cancelled": False, "saved_seconds": saved}
+        record_speculation(kept=1, saved_seconds=saved)
+        return draft.result()
+
+    def cancel_itinerary(self, draft: Future) -> None:
+        """Stop the draft at its next agent step and count the tokens it had already spent, without waiting.
+
+        The draft may finish after the plan is returned, so its tokens only go to SPECULATION_STATS.
+        """
+        self._draft_cancelled.set()
+        self.speculation = {"cancelled": True, "saved_seconds": 0.0}
+
+        def account(future: Future) -> None:
+            itinerary_span = self._itinerary_span
+            trace = getattr(itinerary_span, "trace", None)
+            wasted = 0
+            if trace is not None:
+                totals = trace.totals(itinerary_span)
+                wasted = totals["prompt_tokens"] + totals["completion_tokens"]
+            record_speculation(cancelled=1, wasted_tokens=wasted)
+
+        draft.add_done_callback(account)
+
+    def run_itinerary(self, speculative: bool = False) -> str:
+        if speculative:
+            # Drafts run in a copied context, so only the draft's checks and LLM calls see the flag.
+            _current_draft.set(self._draft_cancelled)
+        with span("phase.itinerary", speculative=speculative) as phase_span:
+            self._itinerary_span = phase_span
+            self._check_draft()
+            self.compact_handoffs()
+            phase_span.set(
+                handoff_tokens_before=sum(handoff.tokens_before for handoff in self.handoffs),
+                handoff_tokens_after=sum(handoff.tokens_after for handoff in self.handoffs),
+            )
+            self._check_draft()
+            # A draft may be cancelled midway, which would fail every request sharing its run.
+            if self.coalesce_itinerary and not speculative:
+                final_plan, shared = itinerary_flights.do(self.itinerary_key(), self._run_itinerary_task)
+            else:
+                final_plan, shared = self._run_itinerary_task(), False
+            phase_span.set(coalesced=shared)
+        return final_plan
+
+
+@dataclass
+class TripPlan:
+    status: str
+    plan: Optional[str] = None
+    research: Optional[str] = None
+    transport: Optional[str] = None
+    costs: Optional[dict] = None
+    budget_check: Optional[dict] = None
+    timings: dict = field(default_factory=dict)
+    handoffs: dict = field(default_factory=dict)
+    reused: list = field(default_factory=list)
+    speculation: dict = field(default_factory=dict)
+    fare_estimate: Optional[dict] = None
+    research_match: Optional[dict] = None
+    governor: dict = field(default_factory=dict)
+    breakdown: list = field(default_factory=list)
+    trace_id: Optional[str] = None
+    # Set when the plan was served from the plan store: when it was originally made.
+    created_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "TripPlan":
+        names = {item.name for item in fields(cls)}
+        return cls(**{name: value for name, value in record.items() if name in names})
+
+
+STORED_FIELDS = ("status", "plan", "research", "transport", "costs", "budget_check", "created_at")
+
+
+def stored_plan(key: tuple, budget: float) -> Optional[TripPlan]:
+    """A stored plan for an equivalent request, re-checked against this request's exact budget."""
+    record = get_plan_store().get(key)
+    if record is None:
+        return None
+    # Only the answer itself carries over; how the original run got there (reuse, fares,
+    # speculation, search counts, handoffs) describes that run, not this one.
+    result = TripPlan.from_dict({name: record.get(name) for name in STORED_FIELDS})
+    sufficient = result.budget_check["min_total"] <= budget
+    if sufficient and result.plan is None:
+        # Stored for a budget that fell short; this one needs the itinerary written.
+        return None
+    result.budget_check = dict(result.budget_check, sufficient=sufficient)
+    if not sufficient:
+        result.status, result.plan = "insufficient_budget", None
+    return result
+
+
+def plan_trip(
+    origin, city, month, duration, people, budget, currency="USD",
+    openai_key=None, serper_key=None, llm=None, search_tool=None, verbose=False,
+    planner_llm=None, memo=None, progress=None, governor=None,
+) -> TripPlan:
+    """Run the full pipeline the page runs and return the plan with its costs and timings.
+
+    Credentials default to OPENAI_API_KEY / SERPER_API_KEY; pass ``llm`` or
+    ``search_tool`` to substitute other backends. ``progress(message, fraction)``
+    is called as each phase starts. Equivalent requests answered within
+    ``TRAVEL_PLANNER_PLAN_TTL`` come straight from the plan store, and research
+    done for a similar enough request is reused (see semantic_cache). Searches,
+    iterations and time are capped by ``governor`` (a default RunGovernor).
+    """
+    unit = currency_unit(currency)
+    timings = {}
+    progress = progress or (lambda message, fraction: None)
+    key = plan_key(origin, city, month, duration, people, budget, CURRENCY_CODES[unit])
+
+    trace_attributes = dict(origin=origin, city=city, month=month, duration=duration, people=people)
+    with start_trace("plan_trip", **trace_attributes) as trace, governed_run(governor or RunGovernor(places=(origin, city))) as governor:
+        started = time.perf_counter()
+        result = stored_plan(key, budget) if PLAN_TTL > 0 else None
+        if result is not None:
+            result.timings = {"plan_store": time.perf_counter() - started}
+            result.breakdown, result.trace_id = [], trace.trace_id
+            return result
+
+        started = time.perf_counter()
+        llm = llm or get_llm(openai_key or os.environ["OPENAI_API_KEY"])
+        search_tool = search_tool or get_search_tool(serper_key or os.environ["SERPER_API_KEY"])
+        planner = TripPlanner(
+            origin, city, month, duration, people, budget, unit, llm, search_tool,
+            planner_llm=planner_llm, verbose=verbose, memo=memo, fare_store=get_fare_store(),
+            research_cache=get_research_cache(openai_key or os.environ.get("OPENAI_API_KEY")) if SEMANTIC_CACHE else None,
+        )
+        timings["setup"] = time.perf_counter() - started
+
+        progress(f"Step 1: Researching trip for {people} person(s)...", 0.1)
+        started = time.perf_counter()
+        research, transport = planner.run_preliminary()
+        timings["preliminary"] = time.perf_counter() - started
+
+        draft = planner.start_itinerary() if planner.speculative else None
+        progress("Checking the budget...", 0.5)
+        started = time.perf_counter()
+        budget_check = planner.validate_budget()
+        timings["budget_check"] = time.perf_counter() - started
+        if draft is not None and not budget_check.sufficient:
+            planner.cancel_itinerary(draft)
+
+        result = TripPlan(
+            status="insufficient_budget",
+            research=research,
+            transport=transport,
+            costs=planner.transport_costs.model_dump() if planner.transport_costs else None,
+            budget_check=asdict(budget_check),
+            timings=timings,
+            reused=planner.reused,
+            fare_estimate=planner.fare_estimate,
+            research_match=planner.research_match,
+            trace_id=trace.trace_id,
+        )
+        if budget_check.sufficient:
+            progress("Step 2: Budget sufficient! Finalizing itinerary and cost split...", 0.6)
+            started = time.perf_counter()
+            result.plan = planner.keep_itinerary(draft) if draft is not None else planner.run_itinerary()
+            timings["itinerary"] = time.perf_counter() - started
+            result.handoffs = {
+                handoff.name: {"tokens_before": handoff.tokens_before, "tokens_after": handoff.tokens_after}
+                for handoff in planner.handoffs
+            }
+            result.status = "ok"
+
+        result.speculation = dict(planner.speculation)
+        result.governor = governor.stats()
+        result.breakdown = trace.breakdown()
+        if PLAN_TTL > 0:
+            get_plan_store().set(key, {name: getattr(result, name) for name in STORED_FIELDS})
+        return result
@@ -0,0 +1,167 @@
+"""Background searches for a trip's predictable Phase 1 questions, made while the form is still being filled in."""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional, Tuple
+
+from governor import place_names, place_order, query_key, query_words
+from normalize import canonical_month
+from search_cache import categorize_query
+
+# Opt-in: prefetched searches cost Serper credits even if the user never clicks Generate.
+PREFETCH = os.environ.get("TRAVEL_PLANNER_PREFETCH", "0") == "1"
+# Seconds the origin, city and month must stay unchanged before searching.
+PREFETCH_DEBOUNCE = float(os.environ.get("TRAVEL_PLANNER_PREFETCH_DEBOUNCE", "1.5"))
+# Seconds a prefetched result may answer an agent's search.
+PREFETCH_TTL = float(os.environ.get("TRAVEL_PLANNER_PREFETCH_TTL", "600"))
+# Agents phrase the same question differently, so this is looser than the run ledger's match; a result
+# only answers queries in its search category that name the same places, in the same order, and month.
+PREFETCH_MATCH = 0.4
+
+_current_store = contextvars.ContextVar("current_prefetch_store", default=None)
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+
+def prefetch_queries(origin: str, city: str, month: str) -> List[Tuple[str, frozenset]]:
+    """The searches the researcher and transport agents almost always start with.
+
+    Each comes with the words a later query must contain to be answered by it.
+    """
+    place = query_words(city)
+    when = place | ({canonical_month(month)} if canonical_month(month) else query_words(month))
+    queries = [
+        (f"top sights and attractions in {city} in {month}", when),
+        (f"{city} weather in {month}", when),
+        (f"{city} average hotel and food costs per day", place),
+    ]
+    if origin:
+        queries.append((f"flights from {origin} to {city} in {month} prices", when | query_words(origin)))
+    return queries
+
+
+class PrefetchStore:
+    """One session's prefetched results, matched by search category, place order and word overlap."""
+
+    def __init__(
+        self, ttl: float = PREFETCH_TTL, threshold: float = PREFETCH_MATCH, clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.clock = clock
+        self.searches = 0
+        self.hits = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, query: str, result: Any, required: frozenset = frozenset(), places: tuple = ()) -> None:
+        """Store ``result``; ``places`` are the trip's, so "from A to B" never answers "from B to A"."""
+        entry = (categorize_query(query), required, places, place_order(query, places), query_words(query), result, self.clock())
+        with self._lock:
+            self.searches += 1
+            self._entries[query_key(query)] = entry
+
+    def _expire(self, now: float) -> None:
+        for key in [key for key, entry in self._entries.items() if now - entry[-1] > self.ttl]:
+            del self._entries[key]
+
+    def fresh(self, query: str) -> bool:
+        """Whether ``query`` has a result that can still answer searches."""
+        with self._lock:
+            self._expire(self.clock())
+            return query_key(query) in self._entries
+
+    def lookup(self, query: str) -> Optional[Any]:
+        words, category = query_words(query), categorize_query(query)
+        best, best_overlap = None, self.threshold
+        with self._lock:
+            self._expire(self.clock())
+            for known_category, required, places, order, known, result, _ in self._entries.values():
+                if known_category != category or not required <= words or place_order(query, places) != order:
+                    continue
+                overlap = len(words & known) / len(words | known)
+                if overlap >= best_overlap:
+                    best, best_overlap = result, overlap
+            if best is not None:
+                self.hits += 1
+        return best
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"searches": self.searches, "hits": self.hits, "entries": len(self._entries)}
+
+
+class Prefetcher:
+    """Debounces form changes and prefetches each new (origin, city, month) while its results aren't stored."""
+
+    def __init__(
+        self, debounce: float = PREFETCH_DEBOUNCE, store: Optional[PrefetchStore] = None, executor: Optional[Executor] = None,
+    ):
+        self.debounce = debounce
+        self.store = store or PrefetchStore()
+        self.executor = executor or _prefetch_pool
+        self._fields = None
+        self._searching = set()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def update(self, origin: str, city: str, month: str, get_search_tool: Callable[[], Any]) -> None:
+        """Call on every rerun with the current fields; searches start once they settle (at once with no debounce)."""
+        fields = (origin.strip(), city.strip(), month.strip())
+        if not fields[1] or not fields[2]:
+            return
+        with self._lock:
+            if fields == self._fields:
+                return
+            self._fields = fields
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.debounce > 0:
+                self._timer = threading.Timer(self.debounce, self._fire, (fields, get_search_tool))
+                self._timer.daemon = True
+                self._timer.start()
+        if self.debounce <= 0:
+            self._fire(fields, get_search_tool)
+
+    def _fire(self, fields: tuple, get_search_tool: Callable[[], Any]) -> None:
+        with self._lock:
+            if fields != self._fields:
+                return
+            # Searched again once a result expires, e.g. when the user comes back to an earlier trip.
+            queries = [
+                (query, required) for query, required in prefetch_queries(*fields)
+                if query not in self._searching and not self.store.fresh(query)
+            ]
+            self._searching.update(query for query, _ in queries)
+        if queries:
+            search_tool = get_search_tool()
+            places = place_names(fields[:2])
+            for query, required in queries:
+                self.executor.submit(self._search, search_tool, query, required, places)
+
+    def _search(self, search_tool: Any, query: str, required: frozenset, places: tuple) -> None:
+        try:
+            # Goes through the tool, so the disk cache and rate limits apply as usual.
+            result = search_tool._run(search_query=query)
+            if isinstance(result, str) and result.strip():
+                self.store.add(query, result, required, places)
+        finally:
+            with self._lock:
+                self._searching.discard(query)
+
+
+def current_prefetch_store() -> Optional[PrefetchStore]:
+    return _current_store.get()
+
+
+@contextmanager
+def prefetched(store: Optional[PrefetchStore]):
+    """Let searches run in this context (and worker threads copied from it) use ``store`` first."""
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
@@ -0,0 +1,210 @@
+"""Client-side rate limiting, retries and hedged requests for the OpenAI and Serper APIs."""
+import contextvars
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+import requests
+
+from tracing import current_span
+
+# Sustained requests per second and burst size, per provider and API key.
+RATE_LIMITS = {
+    "openai": (
+        float(os.environ.get("TRAVEL_PLANNER_OPENAI_RPS", "3")),
+        int(os.environ.get("TRAVEL_PLANNER_OPENAI_BURST", "6")),
+    ),
+    "serper": (
+        float(os.environ.get("TRAVEL_PLANNER_SERPER_RPS", "5")),
+        int(os.environ.get("TRAVEL_PLANNER_SERPER_BURST", "10")),
+    ),
+}
+MAX_RETRIES = int(os.environ.get("TRAVEL_PLANNER_MAX_RETRIES", "5"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Start a duplicate search when the first has not answered within this many seconds; 0 turns hedging off.
+SEARCH_HEDGE_AFTER = float(os.environ.get("TRAVEL_PLANNER_SEARCH_HEDGE_AFTER", "0"))
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_buckets = {}
+_buckets_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+def record(provider: str, **counts: float) -> None:
+    with _stats_lock:
+        _stats[provider].update(counts)
+
+
+def rate_limit_stats() -> dict:
+    """Requests, throttling, 429s, retries and hedges so far, per provider."""
+    with _stats_lock:
+        return {provider: dict(counts) for provider, counts in _stats.items()}
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may go out; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # Nothing refills while paused, so callers don't stampede when a pause ends.
+                refill_from = max(self.updated, self.paused_until)
+                if now > refill_from:
+                    self.tokens = min(self.capacity, self.tokens + (now - refill_from) * self.rate)
+                    self.updated = now
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller sharing this bucket, e.g. after a 429 asked us to back off."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            # One request may probe as soon as the pause ends; the rest wait for the refill.
+            self.tokens = min(self.tokens, 1.0)
+
+
+def get_bucket(provider: str, api_key: str) -> TokenBucket:
+    key = (provider, hashlib.sha256(api_key.encode()).hexdigest())
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(*RATE_LIMITS[provider])
+        return _buckets[key]
+
+
+def throttle(provider: str, bucket: TokenBucket) -> None:
+    waited = bucket.acquire()
+    record(provider, requests=1)
+    if waited:
+        record(provider, throttled=1, throttle_seconds=waited)
+        current_span().increment("throttle_ms", int(waited * 1000))
+
+
+def retry_after(headers: Any) -> Optional[float]:
+    """Seconds the server asked us to wait, from ``retry-after-ms`` or ``Retry-After``."""
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, hint: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, or the server's hint plus a little jitter."""
+    if hint is not None:
+        return min(hint, BACKOFF_CAP) + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def send_with_retries(provider: str, api_key: str, send: Callable[[], requests.Response], max_retries: int = MAX_RETRIES) -> requests.Response:
+    """Rate-limited ``send()`` retried on 429/5xx and connection errors.
+
+    The last response is returned even if it is still an error, so callers
+    keep their own handling of a failed request.
+    """
+    bucket = get_bucket(provider, api_key)
+    for attempt in range(max_retries + 1):
+        throttle(provider, bucket)
+        try:
+            response = send()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+                return response
+            hint = retry_after(response.headers)
+            delay = backoff_delay(attempt, hint)
+            if response.status_code == 429:
+                # The pause holds this caller too, in the next throttle() call.
+                record(provider, rate_limited=1)
+                bucket.pause(delay)
+                delay = 0.0
+        record(provider, retries=1)
+        current_span().increment("retries")
+        time.sleep(delay)
+
+
+def hedged(provider: str, fn: Callable[[], Any], after: float = SEARCH_HEDGE_AFTER) -> Any:
+    """Run ``fn``; if it is still going after ``after`` seconds, race a duplicate and take the first success."""
+    if after <= 0:
+        return fn()
+    # Each attempt runs in its own copy of the caller's context so spans nest under the caller's.
+    first = _hedge_pool.submit(contextvars.copy_context().run, fn)
+    if wait([first], timeout=after).done:
+        return first.result()
+
+    record(provider, hedges=1)
+    second = _hedge_pool.submit(contextvars.copy_context().run, fn)
+    pending = {first, second}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=lambda future: future.exception() is not None):
+            if future.exception() is None or not pending:
+                if future is second:
+                    record(provider, hedge_wins=1)
+                return future.result()
+
+
+def openai_event_hooks() -> dict:
+    """httpx hooks that put every OpenAI request through the per-key bucket.
+
+    The OpenAI client already retries with backoff and honors Retry-After;
+    these hooks add the shared budget and make a 429 pause every caller on
+    that key rather than only the one that hit it.
+    """
+
+    def bucket_for(request) -> TokenBucket:
+        return get_bucket("openai", request.headers.get("authorization", ""))
+
+    def on_request(request) -> None:
+        throttle("openai", bucket_for(request))
+
+    def on_response(response) -> None:
+        if response.status_code in RETRY_STATUSES:
+            # The client retries these itself; counted here rather than from its INFO logging.
+            record("openai", retries=1)
+            current_span().increment("retries")
+        if response.status_code == 429:
+            record("openai", rate_limited=1)
+            bucket_for(response.request).pause(backoff_delay(0, retry_after(response.headers)))
+
+    return {"request": [on_request], "response": [on_response]}
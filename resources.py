@@ -0,0 +1,85 @@
+"""Process-wide clients reused across Streamlit reruns and sessions."""
+from typing import TYPE_CHECKING, Any, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from jobs import JobQueue
+from llm_cache import get_completion_cache
+from ratelimit import MAX_RETRIES, openai_event_hooks
+from semantic_cache import (
+    EMBEDDING_DIMENSIONS, EMBEDDING_MODEL, EMBEDDINGS, SEMANTIC_DIR, HashingEmbedder, LangChainEmbedder, SemanticCache,
+)
+from shared import shared_resource
+from tracing import TRACING_HANDLER
+
+# The agent stack is imported where it's first used, so pages can start without it (see startup.py).
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from search_tool import CachedSerperDevTool
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+@shared_resource
+def get_openai_http_client() -> httpx.Client:
+    """Keep-alive connection pool shared by every ChatOpenAI instance, rate-limited per API key."""
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        event_hooks=openai_event_hooks(),
+    )
+
+
+@shared_resource
+def get_serper_session() -> requests.Session:
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+    return session
+
+
+def make_llm(api_key: str, model: str = DEFAULT_MODEL, streaming: bool = False, callbacks: Optional[List[Any]] = None) -> "ChatOpenAI":
+    """A ChatOpenAI on the shared connection pool; cheap enough to build per request."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model, api_key=api_key, http_client=get_openai_http_client(),
+        cache=get_completion_cache(), streaming=streaming, max_retries=MAX_RETRIES,
+        callbacks=[TRACING_HANDLER, *(callbacks or [])]
+    )
+
+
+@shared_resource
+def get_llm(api_key: str, model: str = DEFAULT_MODEL) -> "ChatOpenAI":
+    """Non-streaming LLM, built once per API key and model."""
+    return make_llm(api_key, model)
+
+
+@shared_resource
+def get_search_tool(api_key: str) -> "CachedSerperDevTool":
+    from search_tool import CachedSerperDevTool
+
+    return CachedSerperDevTool(api_key=api_key, session=get_serper_session())
+
+
+@shared_resource
+def get_research_cache(api_key: Optional[str] = None) -> SemanticCache:
+    """Research similarity cache; embeds through OpenAI with ``api_key``, or locally without one."""
+    if EMBEDDINGS == "openai" and api_key:
+        from langchain_openai import OpenAIEmbeddings
+
+        embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL, api_key=api_key, dimensions=EMBEDDING_DIMENSIONS, http_client=get_openai_http_client(),
+            max_retries=MAX_RETRIES, check_embedding_ctx_length=False,
+        )
+        embedder = LangChainEmbedder(embeddings, f"openai-{EMBEDDING_MODEL}", EMBEDDING_DIMENSIONS)
+    else:
+        embedder = HashingEmbedder()
+    return SemanticCache(SEMANTIC_DIR, embedder)
+
+
+@shared_resource
+def get_job_queue() -> JobQueue:
+    """The one planning queue every session submits to, so concurrency is capped per process."""
+    return JobQueue()
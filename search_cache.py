@@ -0,0 +1,122 @@
+"""Disk-backed, TTL-bounded cache for Serper web search results."""
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from shared import shared_resource
+from sqlite_store import connect, evict_lru
+
+CACHE_DIR = os.environ.get("TRAVEL_PLANNER_CACHE_DIR", ".cache")
+
+# How long (seconds) a cached result stays fresh, per query category.
+CATEGORY_TTLS = {
+    "flights": 6 * 3600,
+    "weather": 24 * 3600,
+    "costs": 3 * 24 * 3600,
+    "sights": 30 * 24 * 3600,
+    "general": 7 * 24 * 3600,
+}
+
+# First matching category wins, so the volatile ones come first.
+CATEGORY_KEYWORDS = [
+    ("flights", ("flight", "fare", "airline", "airfare", "ticket", "train", "bus")),
+    ("weather", ("weather", "temperature", "rain", "climate", "forecast")),
+    ("costs", ("cost", "price", "hotel", "budget", "cheap", "expensive", "food")),
+    ("sights", ("sight", "attraction", "things to do", "museum", "landmark", "activities", "visit")),
+]
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivially different queries share a key."""
+    query = re.sub(r"[^\w\s→-]", " ", str(query).lower())
+    return " ".join(query.split())
+
+
+def categorize_query(query: str) -> str:
+    normalized = normalize_query(query)
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in normalized for keyword in keywords):
+            return category
+    return "general"
+
+
+class SearchCache:
+    """SQLite-backed search cache with per-category TTLs and LRU size eviction."""
+
+    def __init__(self, path: str, max_entries: int = 5000, max_bytes: int = 50 * 1024 * 1024, ttls: Optional[dict] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(CATEGORY_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = connect(
+            path,
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, category TEXT, value TEXT, size INTEGER, "
+            "created_at REAL, last_access REAL)",
+        )
+
+    def _key(self, query: str, namespace: str) -> str:
+        return f"{namespace}|{normalize_query(query)}"
+
+    def get(self, query: str, namespace: str = "") -> Any:
+        key = self._key(query, namespace)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category, value, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[2] > self.ttls.get(row[0], self.ttls["general"]):
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[1])
+
+    def set(self, query: str, value: Any, namespace: str = "") -> None:
+        key = self._key(query, namespace)
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, categorize_query(query), payload, len(payload.encode("utf-8")), now, now),
+            )
+            evict_lru(self._conn, "search_cache", self.max_entries, self.max_bytes)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+        }
+
+
+@shared_resource
+def get_search_cache() -> SearchCache:
+    """Process-wide search cache shared by every planning run."""
+    return SearchCache(os.path.join(CACHE_DIR, "search_cache.sqlite"))
@@ -0,0 +1,88 @@
+"""Serper search tool that reads through the search cache, rate limits and run governor."""
+import json
+import os
+from typing import Any, Optional
+
+import requests
+from crewai_tools import SerperDevTool
+from pydantic import Field
+
+from governor import governed_search
+from prefetch import current_prefetch_store
+from ratelimit import hedged, send_with_retries
+from search_cache import get_search_cache
+from tracing import span
+
+# Overridable so load tests can point the tool at a local stand-in.
+SERPER_URL = os.environ.get("TRAVEL_PLANNER_SERPER_URL", "https://google.serper.dev/search")
+# (connect, read) seconds; a stalled search becomes a Timeout that send_with_retries retries.
+SERPER_TIMEOUT = (5.0, float(os.environ.get("TRAVEL_PLANNER_SERPER_TIMEOUT", "20")))
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that answers from the search cache before going to the network.
+
+    ``api_key`` and ``session`` let callers pass credentials and a pooled
+    keep-alive session per client instead of through ``SERPER_API_KEY``.
+    """
+
+    search_cache: Any = None
+    search_url: str = SERPER_URL
+    api_key: Optional[str] = Field(default=None, repr=False)
+    session: Any = Field(default=None, repr=False)
+
+    def _search(self, query: str) -> Any:
+        api_key = self.api_key or os.environ["SERPER_API_KEY"]
+        headers = {"X-API-KEY": api_key, "content-type": "application/json"}
+
+        def post():
+            return (self.session or requests).post(
+                self.search_url, headers=headers, data=json.dumps({"q": query}), timeout=SERPER_TIMEOUT,
+            )
+
+        # Rate-limited and retried per key; a slow search can be raced by a duplicate (see ratelimit).
+        response = hedged("serper", lambda: send_with_retries("serper", api_key, post))
+        results = response.json()
+        if "organic" not in results:
+            return results
+
+        lines = []
+        for result in results["organic"][: self.n_results]:
+            try:
+                lines.append("\n".join([
+                    f"Title: {result['title']}",
+                    f"Link: {result['link']}",
+                    f"Snippet: {result['snippet']}",
+                    "---",
+                ]))
+            except KeyError:
+                continue
+        content = "\n".join(lines)
+        return f"\nSearch results: {content}\n"
+
+    def _run(self, **kwargs: Any) -> Any:
+        cache = self.search_cache or get_search_cache()
+        query = kwargs.get("search_query") or kwargs.get("query")
+        namespace = f"{self.search_url}|{self.n_results}"
+
+        def search():
+            cached = cache.get(query, namespace)
+            search_span.set(**{"cache.hit": cached is not None})
+            if cached is not None:
+                return cached
+
+            result = self._search(query)
+            # Serper errors come back as a raw dict; only formatted result strings are worth keeping.
+            if isinstance(result, str) and result.strip():
+                cache.set(query, result, namespace)
+            return result
+
+        with span("tool.search", **{"tool.query": query}) as search_span:
+            # Answers prefetched for this session while the form was filled in come first, for free.
+            store = current_prefetch_store()
+            prefetched = store.lookup(query) if store is not None else None
+            search_span.set(**{"prefetch.hit": prefetched is not None})
+            if prefetched is not None:
+                return prefetched
+            # Repeats within a run come from the run's ledger and don't count against its search caps.
+            return governed_search(query, search)
@@ -0,0 +1,180 @@
+"""Similarity cache of destination research, matched by embedding so differently worded requests can share it."""
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from normalize import normalize_text
+from search_cache import CACHE_DIR
+from sqlite_store import connect
+
+SEMANTIC_CACHE = os.environ.get("TRAVEL_PLANNER_SEMANTIC_CACHE", "1") == "1"
+# Cosine similarity a stored request needs to answer a new one.
+SEMANTIC_THRESHOLD = float(os.environ.get("TRAVEL_PLANNER_SEMANTIC_THRESHOLD", "0.9"))
+# Research is about sights and seasons, which change slowly; search results for sights keep for 30 days.
+SEMANTIC_TTL = float(os.environ.get("TRAVEL_PLANNER_SEMANTIC_TTL", str(7 * 24 * 3600)))
+SEMANTIC_CAPACITY = int(os.environ.get("TRAVEL_PLANNER_SEMANTIC_CAPACITY", "2000"))
+# "openai" embeds with EMBEDDING_MODEL; "hash" uses local character n-grams, which need no API calls
+# but only match near-identical text. Research queries are canonicalized before either sees them.
+EMBEDDINGS = os.environ.get("TRAVEL_PLANNER_EMBEDDINGS", "openai")
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 256
+SEMANTIC_DIR = os.path.join(CACHE_DIR, "semantic")
+
+
+def normalized(vector: Any) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class HashingEmbedder:
+    """Signed feature hashing of character trigrams; stable across processes, unlike ``hash()``."""
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, n: int = 3):
+        self.dimensions = dimensions
+        self.n = n
+        self.name = f"hash{n}gram"
+
+    def embed(self, text: str) -> np.ndarray:
+        words = re.sub(r"[^\w\s]", " ", normalize_text(text))
+        text = f" {' '.join(words.split())} "
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for start in range(len(text) - self.n + 1):
+            digest = hashlib.blake2b(text[start:start + self.n].encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        return normalized(vector)
+
+
+class LangChainEmbedder:
+    """Any LangChain ``Embeddings`` (e.g. OpenAIEmbeddings) returning ``dimensions``-long vectors."""
+
+    def __init__(self, embeddings: Any, name: str, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.embeddings = embeddings
+        self.name = name
+        self.dimensions = dimensions
+
+    def embed(self, text: str) -> np.ndarray:
+        return normalized(self.embeddings.embed_query(text))
+
+
+class SemanticCache:
+    """Brute-force cosine search over a memory-mapped vector matrix, with metadata in SQLite.
+
+    Each embedder gets its own files, as vectors from different models aren't
+    comparable. Rows claim matrix slots; expired and least recently used rows
+    give theirs up once ``capacity`` is reached.
+    """
+
+    def __init__(
+        self, directory: str, embedder: Any, threshold: float = SEMANTIC_THRESHOLD, ttl: float = SEMANTIC_TTL,
+        capacity: int = SEMANTIC_CAPACITY, name: str = "research",
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        base = os.path.join(directory, f"{name}.{embedder.name}.{embedder.dimensions}")
+        os.makedirs(directory, exist_ok=True)
+        self._conn = connect(
+            f"{base}.sqlite",
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "slot INTEGER PRIMARY KEY, text TEXT, month TEXT, value TEXT, created_at REAL, last_access REAL)",
+        )
+        shape = (capacity, embedder.dimensions)
+        path = f"{base}.f32"
+        if os.path.exists(path) and os.path.getsize(path) != capacity * embedder.dimensions * 4:
+            # Capacity changed since the matrix was made; its slots no longer line up.
+            os.remove(path)
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+" if os.path.exists(path) else "w+", shape=shape)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            return self.embedder.embed(text)
+        except Exception:
+            # An embedding outage only costs the cache its hits.
+            with self._lock:
+                self.errors += 1
+            return None
+
+    def lookup(self, text: str, month: Optional[str] = None) -> Optional[dict]:
+        """The most similar live entry above the threshold, as ``{"value", "text", "similarity"}``.
+
+        Entries for another month never match; entries without one match any.
+        """
+        query = self._embed(text)
+        if query is None:
+            return None
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT slot FROM entries WHERE created_at >= ? AND (month IS NULL OR ? IS NULL OR month = ?)",
+                (now - self.ttl, month, month),
+            ).fetchall()
+            best = None
+            if rows:
+                slots = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+                similarities = self._vectors[slots] @ query
+                index = int(np.argmax(similarities))
+                if similarities[index] >= self.threshold:
+                    best = int(slots[index]), float(similarities[index])
+            # Another process may have evicted the entry since the slots were read.
+            row = self._conn.execute("SELECT text, value FROM entries WHERE slot = ?", (best[0],)).fetchone() if best else None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE slot = ?", (now, best[0]))
+            self._conn.commit()
+            self.hits += 1
+        return {"text": row[0], "value": row[1], "similarity": best[1]}
+
+    def add(self, text: str, value: str, month: Optional[str] = None) -> None:
+        vector = self._embed(text)
+        if vector is None:
+            return
+        now = time.time()
+        with self._lock:
+            # Held from choosing a slot to filling it, so processes sharing these files never pick the same one.
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+            used = {row[0] for row in self._conn.execute("SELECT slot FROM entries")}
+            if len(used) >= self.capacity:
+                oldest, = self._conn.execute("SELECT slot FROM entries ORDER BY last_access ASC LIMIT 1").fetchone()
+                self._conn.execute("DELETE FROM entries WHERE slot = ?", (oldest,))
+                used.discard(oldest)
+            slot = next(slot for slot in range(self.capacity) if slot not in used)
+            self._vectors[slot] = vector
+            self._vectors.flush()
+            # Readers only see the slot once its row commits, after the vector is in place.
+            self._conn.execute("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", (slot, text, month, value, now, now))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "errors": self.errors,
+            "entries": count,
+            "capacity": self.capacity,
+        }
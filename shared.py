@@ -0,0 +1,33 @@
+"""One instance per process of the clients, caches and stores every run shares."""
+import functools
+import threading
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+def shared_resource(func):
+    """``st.cache_resource`` on a Streamlit script thread, a plain process-wide memo elsewhere.
+
+    Job and timer threads have no script context, and ``st.cache_resource`` warns on every call
+    from them; both paths share the memo underneath, so every thread gets the same instance.
+    """
+    cached = functools.lru_cache(maxsize=None)(func)
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def memoized(*args, **kwargs):
+        # lru_cache alone can build twice when two threads miss at once.
+        with lock:
+            return cached(*args, **kwargs)
+
+    streamlit_cached = st.cache_resource(show_spinner=False)(memoized)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if runtime.exists() and get_script_run_ctx(suppress_warning=True) is not None:
+            return streamlit_cached(*args, **kwargs)
+        return memoized(*args, **kwargs)
+
+    return wrapper
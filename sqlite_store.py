@@ -0,0 +1,29 @@
+"""SQLite plumbing shared by the on-disk caches and stores."""
+import os
+import sqlite3
+
+
+def connect(path: str, *schema: str) -> sqlite3.Connection:
+    """A connection usable from any thread (callers hold their own lock), with ``schema`` applied."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    for statement in schema:
+        conn.execute(statement)
+    conn.commit()
+    return conn
+
+
+def evict_lru(conn: sqlite3.Connection, table: str, max_entries: int, max_bytes: int) -> None:
+    """Delete least recently used rows until ``table`` is within both caps.
+
+    The table needs ``key``, ``size`` and ``last_access`` columns; the caller commits.
+    """
+    count, total = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}").fetchone()
+    if count <= max_entries and total <= max_bytes:
+        return
+    for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY last_access ASC").fetchall():
+        if count <= max_entries and total <= max_bytes:
+            break
+        conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        count -= 1
+        total -= size
@@ -0,0 +1,127 @@
+"""Lazy loading of the agent stack (crewAI, its tools, LangChain's OpenAI client) and an import-time report.
+
+Usage:
+    python startup.py            # cold-start report for a fresh process
+    python startup.py --top 30
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Background warm-up after the page first renders; 0 loads the stack on the first Generate instead.
+WARMUP = os.environ.get("TRAVEL_PLANNER_WARMUP", "1") == "1"
+# What the page imports up front to render the form and sidebar.
+PAGE_MODULES = (
+    "streamlit", "jobs", "search_cache", "fares", "plan_store", "llm_cache", "resources", "streaming", "coalesce",
+    "prefetch", "semantic_cache", "ratelimit", "tracing",
+)
+# Imported in this order, so each one's time is what it adds on top of those before it.
+AGENT_STACK = ("crewai", "crewai_tools", "langchain_openai", "search_tool", "planner", "compare")
+
+_loaded = threading.Event()
+_load_lock = threading.Lock()
+_warmup_started = False
+IMPORT_STATS = {"import_seconds": {}, "loaded_by": None, "rss_before_mb": 0.0, "rss_after_mb": 0.0}
+
+
+def rss_mb() -> float:
+    """Resident memory of this process (Linux only; 0 elsewhere)."""
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def agent_stack_loaded() -> bool:
+    return _loaded.is_set()
+
+
+def load_agent_stack(loaded_by: str = "request") -> None:
+    """Import the agent stack once per process; concurrent callers wait for the first."""
+    if _loaded.is_set():
+        return
+    with _load_lock:
+        if _loaded.is_set():
+            return
+        # crewAI's telemetry imports pkg_resources only to read its own version; a stub keeps
+        # setuptools (and its slow import) out of the process.
+        sys.modules.setdefault("pkg_resources", MagicMock())
+        IMPORT_STATS["rss_before_mb"] = rss_mb()
+        for name in AGENT_STACK:
+            started = time.perf_counter()
+            importlib.import_module(name)
+            IMPORT_STATS["import_seconds"][name] = time.perf_counter() - started
+        IMPORT_STATS["rss_after_mb"] = rss_mb()
+        IMPORT_STATS["loaded_by"] = loaded_by
+        _loaded.set()
+
+
+def warm_up() -> None:
+    """Load the agent stack on a background thread, at most once per process."""
+    global _warmup_started
+    with _load_lock:
+        if _warmup_started or _loaded.is_set():
+            return
+        _warmup_started = True
+    threading.Thread(target=load_agent_stack, args=("warm-up",), name="agent-stack-warmup", daemon=True).start()
+
+
+def import_report(top: int = 20) -> dict:
+    """Import-time profile of a fresh interpreter loading the page, then the agent stack (``python -X importtime``)."""
+    code = (
+        "import sys, resource, time; from unittest.mock import MagicMock; "
+        "sys.modules['pkg_resources'] = MagicMock(); rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss; "
+        f"started = time.perf_counter(); [__import__(name) for name in {PAGE_MODULES!r}]; "
+        "page = time.perf_counter() - started; page_rss = rss(); "
+        f"started = time.perf_counter(); [__import__(name) for name in {AGENT_STACK!r}]; "
+        "print(page, page_rss, time.perf_counter() - started, rss())"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=dict(os.environ, OTEL_SDK_DISABLED="true"),
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(cumulative) / 1e6))
+    page_seconds, page_rss_kb, stack_seconds, stack_rss_kb = completed.stdout.split()[-4:]
+    # One row per package (its root module, wherever it was first imported), inclusive of its submodules.
+    packages = [module for module in modules if "." not in module[0]]
+    return {
+        "page_seconds": float(page_seconds),
+        "page_rss_mb": int(page_rss_kb) / 1024,
+        "agent_stack_seconds": float(stack_seconds),
+        "agent_stack_rss_mb": int(stack_rss_kb) / 1024,
+        "modules": len(modules),
+        "slowest": sorted(packages, key=lambda module: module[1], reverse=True)[:top],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report how long a fresh process takes to import the page and the agent stack.")
+    parser.add_argument("--top", type=int, default=20, help="packages to list, slowest first")
+    args = parser.parse_args(argv)
+
+    report = import_report(args.top)
+    print(f"Page:        {report['page_seconds']:.2f}s, peak RSS {report['page_rss_mb']:.0f} MB")
+    print(
+        f"Agent stack: +{report['agent_stack_seconds']:.2f}s, peak RSS {report['agent_stack_rss_mb']:.0f} MB "
+        f"({report['modules']} modules in all)"
+    )
+    for name, seconds in report["slowest"]:
+        print(f"{seconds:>8.3f}s  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Stream an agent's final answer to the page while the LLM is still writing it."""
+import time
+from typing import Any, Callable, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class FinalAnswerStreamHandler(BaseCallbackHandler):
+    """Forwards the text after ``Final Answer:`` to ``on_update``, throttled.
+
+    The agent's Thought/Action steps stream through the same LLM, so only the
+    part of a generation following the marker is ever shown.
+    """
+
+    def __init__(self, on_update: Optional[Callable[[str], Any]] = None, min_interval: float = 0.15):
+        self.on_update = on_update
+        self.min_interval = min_interval
+        self._buffer = ""
+        self._last_push = 0.0
+
+    def _answer(self) -> Optional[str]:
+        marker = self._buffer.find(FINAL_ANSWER_MARKER)
+        if marker == -1:
+            return None
+        return self._buffer[marker + len(FINAL_ANSWER_MARKER):].lstrip()
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self._buffer = ""
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self._buffer = ""
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self._buffer += token
+        answer = self._answer()
+        now = time.monotonic()
+        if answer and self.on_update and now - self._last_push >= self.min_interval:
+            self._last_push = now
+            self.on_update(answer + "▌")
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        answer = self._answer()
+        if answer and self.on_update:
+            self.on_update(answer)
+
@@ -0,0 +1,102 @@
+"""Dependency-aware parallel execution of crewAI tasks."""
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List
+
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+
+from governor import agent_scope
+from tracing import span
+
+
+def task_dependencies(task: Task) -> List[Task]:
+    return list(task.context or [])
+
+
+def set_task_output(task: Task, text: str) -> None:
+    """Mark ``task`` as done with ``text``, e.g. when its result was produced elsewhere."""
+    task.output = TaskOutput(description=task.description, exported_output=text, raw_output=text)
+
+
+def run_single_task(task: Task) -> str:
+    """Run one task in its own single-agent crew so it gets the usual crew setup."""
+    attributes = {"agent.role": task.agent.role, "task.description": task.description[:200]}
+    with span("task", **attributes), agent_scope(task.agent):
+        crew = Crew(agents=[task.agent], tasks=[task])
+        return str(crew.kickoff())
+
+
+class TaskScheduler:
+    """Runs tasks as soon as everything in their ``Task.context`` has finished.
+
+    Independent tasks share a bounded worker pool; a task whose context lists
+    several others acts as a join point. Tasks assigned to the same agent never
+    run at the same time because an agent's executor is not thread-safe.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+
+    def run(self, tasks: List[Task]) -> List[str]:
+        """Execute ``tasks`` and return their outputs in the order given."""
+        scheduled = {id(task) for task in tasks}
+        for task in tasks:
+            for dependency in task_dependencies(task):
+                if id(dependency) not in scheduled and dependency.output is None:
+                    raise ValueError(
+                        f"Task '{task.description[:60]}' depends on a task that has not run and is not scheduled."
+                    )
+        self._check_acyclic(tasks)
+
+        outputs = {}
+        pending = list(tasks)
+        running = {}
+        busy_agents = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for task in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    ready = all(
+                        id(dependency) in outputs or id(dependency) not in scheduled
+                        for dependency in task_dependencies(task)
+                    )
+                    if ready and id(task.agent) not in busy_agents:
+                        pending.remove(task)
+                        busy_agents.add(id(task.agent))
+                        # Each task runs in a copy of the caller's context so its spans nest under the caller's.
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, run_single_task, task)] = task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    busy_agents.discard(id(task.agent))
+                    try:
+                        outputs[id(task)] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+
+        return [outputs[id(task)] for task in tasks]
+
+    @staticmethod
+    def _check_acyclic(tasks: List[Task]) -> None:
+        visiting, visited = set(), set()
+
+        def visit(task):
+            if id(task) in visited:
+                return
+            if id(task) in visiting:
+                raise ValueError(f"Task '{task.description[:60]}' is part of a dependency cycle.")
+            visiting.add(id(task))
+            for dependency in task_dependencies(task):
+                visit(dependency)
+            visiting.discard(id(task))
+            visited.add(id(task))
+
+        for task in tasks:
+            visit(task)
@@ -0,0 +1,49 @@
+from budget import FareOption, TransportCosts, check_budget, parse_transport_costs
+
+RECORD = (
+    '{"currency": "USD", "price_basis": "per_person", "travelers": 2, '
+    '"fares": [{"airline": "Air India", "flight_number": "AI131", "price": 650}, {"airline": "BA", "price": 700}]}'
+)
+
+
+def test_parses_the_fenced_record_after_the_prose():
+    text = f"1. Air India AI131, $650 per person.\n2. BA, $700 per person.\n```json\n{RECORD}\n```"
+    costs = parse_transport_costs(text)
+    assert costs.currency == "USD"
+    assert [fare.price for fare in costs.fares] == [650, 700]
+    assert costs.cheapest_total(people=2) == 1300
+
+
+def test_takes_the_last_valid_record_fenced_or_not():
+    earlier = '```json\n{"currency": "USD", "price_basis": "per_person", "fares": [{"price": 999}]}\n```'
+    broken = '```json\n{"currency": "USD", "price_basis": "per_person", "fares": []}\n```'
+    costs = parse_transport_costs(f"{earlier}\nThen the final record: {RECORD}\n{broken}")
+    assert [fare.price for fare in costs.fares] == [650, 700]
+
+
+def test_no_record_or_invalid_json():
+    assert parse_transport_costs("Flights cost around $650 per person.") is None
+    assert parse_transport_costs('```json\n{"currency": "USD", "price_basis": "each"}\n```') is None
+    assert parse_transport_costs("```json\n{not json}\n```") is None
+
+
+def test_total_prices_are_split_per_traveler():
+    costs = TransportCosts(currency="USD", price_basis="total", travelers=2, fares=[FareOption(price=1000)])
+    check = check_budget(costs, budget=2000, duration=3, people=4, unit="$")
+    assert check.transport_total == 2000
+    assert check.min_total == 80 * 3 * 4 + 2000
+    assert not check.sufficient
+    assert check.transport_status == "ok"
+
+
+def test_missing_costs_cover_the_stay_alone():
+    check = check_budget(None, budget=500, duration=3, people=2, unit="$")
+    assert (check.transport_total, check.min_total, check.sufficient) == (None, 480, True)
+    assert check.transport_status == "missing"
+
+
+def test_other_currency_is_reported_not_converted():
+    costs = TransportCosts(currency="inr", price_basis="per_person", fares=[FareOption(price=40000)])
+    check = check_budget(costs, budget=500, duration=3, people=2, unit="$")
+    assert (check.transport_total, check.min_total) == (None, 480)
+    assert (check.transport_status, check.transport_currency) == ("currency_mismatch", "INR")
@@ -0,0 +1,36 @@
+import time
+
+from budget import FareOption, TransportCosts
+from fares import FareStore, fare_month
+
+OCTOBER_2026 = time.mktime((2026, 10, 17, 12, 0, 0, 0, 0, -1))
+
+
+def costs(*prices):
+    fares = [FareOption(airline="Air", flight_number=f"A{number}", price=price) for number, price in enumerate(prices)]
+    return TransportCosts(currency="USD", price_basis="per_person", fares=fares)
+
+
+def test_month_is_keyed_with_its_year():
+    assert fare_month("June 2026") == "june 2026"
+    assert fare_month("June", now=OCTOBER_2026) == "june 2027"
+    assert fare_month("December", now=OCTOBER_2026) == "december 2026"
+    assert fare_month("sometime") is None
+
+
+def test_years_and_unparsed_months_do_not_share_fares(tmp_path):
+    store = FareStore(str(tmp_path / "fares.sqlite"))
+    store.record("Mumbai", "London", "June 2026", costs(500, 600))
+    store.record("Mumbai", "London", "whenever", costs(100, 200))
+    assert store.recent("Mumbai", "London", "June 2027", "USD") is None
+    assert store.recent("Mumbai", "London", "whenever", "USD") is None
+    assert [fare.price for fare in store.recent("mumbai", "london", "jun 2026", "USD").fares] == [500, 600]
+    assert store.stats()["observations"] == 2
+
+
+def test_percentiles_follow_the_requested_window(tmp_path):
+    store = FareStore(str(tmp_path / "fares.sqlite"))
+    store.record("Mumbai", "London", "June 2026", costs(900), observed_at=time.time() - 30 * 24 * 3600)
+    store.record("Mumbai", "London", "June 2026", costs(500, 600))
+    assert store.percentiles("Mumbai", "London", "June 2026", "USD")["count"] == 3
+    assert store.percentiles("Mumbai", "London", "June 2026", "USD", max_age=3600)["count"] == 2
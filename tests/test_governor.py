@@ -0,0 +1,32 @@
+from governor import QueryLedger
+
+LONDON = ("mumbai", "london")
+PARIS = ("mumbai", "paris")
+
+
+def test_exact_repeat_is_shared_across_runs():
+    ledger = QueryLedger()
+    ledger.record("Mumbai visa requirements", "visa", LONDON)
+    assert ledger.lookup("mumbai visa requirements.", PARIS) == "visa"
+
+
+def test_direction_is_kept():
+    ledger = QueryLedger()
+    ledger.record("flights from Mumbai to London", "outbound", LONDON)
+    assert ledger.lookup("flights from London to Mumbai", LONDON) is None
+    assert ledger.lookup("cheap flights from Mumbai to London", LONDON) is None
+    assert ledger.lookup("the flights from Mumbai to London", LONDON) == "outbound"
+
+
+def test_near_duplicates_stay_within_a_destination():
+    ledger = QueryLedger()
+    query = "cheapest round trip economy flights from Mumbai to {} June 2026 prices"
+    ledger.record(query.format("London"), "london fares", LONDON)
+    assert ledger.lookup(query.format("Paris"), PARIS) is None
+    assert ledger.lookup(query.format("London") + " today", LONDON) == "london fares"
+
+
+def test_no_near_duplicates_without_places():
+    ledger = QueryLedger()
+    ledger.record("flights from Mumbai to London", "outbound")
+    assert ledger.lookup("flights from London to Mumbai") is None
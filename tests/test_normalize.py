@@ -0,0 +1,23 @@
+from normalize import canonical_month, plan_key
+
+
+def test_month_name_wins_over_day_number():
+    assert canonical_month("3 June 2026") == "june"
+    assert canonical_month("5 Jun") == "june"
+
+
+def test_words_that_only_start_like_a_month_are_ignored():
+    assert canonical_month("Maybe July") == "july"
+    assert canonical_month("maybe") is None
+
+
+def test_bare_number_is_a_month_only_without_a_month_name():
+    assert canonical_month("06") == "june"
+    assert canonical_month("2026-03") == "march"
+    assert canonical_month("sept") == "september"
+
+
+def test_plan_key_keeps_day_and_month_apart():
+    trip = dict(origin="Mumbai", city="London", duration=3, people=2, budget=3000, currency="USD")
+    assert plan_key(month="3 June 2026", **trip) != plan_key(month="March 2026", **trip)
+    assert plan_key(month="3 June 2026", **trip) == plan_key(month="june 2026", **trip)
@@ -0,0 +1,54 @@
+from prefetch import Prefetcher, PrefetchStore, prefetch_queries
+
+PLACES = ("mumbai", "london")
+
+
+def test_outbound_flights_do_not_answer_the_return_leg():
+    store = PrefetchStore()
+    query, required = prefetch_queries("Mumbai", "London", "June 2026")[-1]
+    store.add(query, "outbound", required, PLACES)
+    assert store.lookup("flights from Mumbai to London June 2026 prices") == "outbound"
+    assert store.lookup("flights from London to Mumbai June 2026 prices") is None
+
+
+class CountingTool:
+    def __init__(self):
+        self.queries = []
+
+    def _run(self, search_query):
+        self.queries.append(search_query)
+        return f"results for {search_query}"
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_expired_results_are_prefetched_again():
+    tool, clock = CountingTool(), Clock()
+    prefetcher = Prefetcher(debounce=0, store=PrefetchStore(ttl=600, clock=clock), executor=InlineExecutor())
+    london, paris = ("Mumbai", "London", "June 2026"), ("Mumbai", "Paris", "June 2026")
+
+    prefetcher.update(*london, lambda: tool)
+    prefetcher.update(*london, lambda: tool)
+    assert len(tool.queries) == 4
+
+    # Back to London while its results are fresh: nothing to search.
+    prefetcher.update(*paris, lambda: tool)
+    prefetcher.update(*london, lambda: tool)
+    assert len(tool.queries) == 8
+
+    clock.now += 601
+    prefetcher.update(*paris, lambda: tool)
+    prefetcher.update(*london, lambda: tool)
+    assert len(tool.queries) == 16
+    assert prefetcher.store.lookup("weather in London in June 2026") == "results for London weather in June 2026"
@@ -0,0 +1,310 @@
+"""Span tracing for planning runs, exported as OpenTelemetry-compatible JSON."""
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+TRACE_FILE = os.environ.get("TRAVEL_PLANNER_TRACE_FILE", os.path.join("traces", "planner-traces.jsonl"))
+# Past this size the trace file is moved to "<name>.1" (replacing the previous one) and started afresh.
+TRACE_MAX_BYTES = int(os.environ.get("TRAVEL_PLANNER_TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+SERVICE_NAME = "ai-travel-planner"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.events = []
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self._steps = 0
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self.trace.lock:
+            self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    def next_step(self) -> int:
+        with self.trace.lock:
+            self._steps += 1
+            return self._steps
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if error is not None:
+                self.error = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {"timeUnixNano": str(event["time_ns"]), "name": event["name"], "attributes": _otlp_attributes(event["attributes"])}
+                for event in self.events
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span when no trace is active, so callers never branch."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        span = Span(self, name, parent, attributes)
+        with self.lock:
+            self.spans.append(span)
+        return span
+
+    def to_otlp(self) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{"scope": {"name": "travel-planner"}, "spans": [span.to_otlp() for span in self.spans]}],
+            }]
+        }
+
+    def export(self, path: str = TRACE_FILE, max_bytes: int = TRACE_MAX_BYTES) -> None:
+        line = json.dumps(self.to_otlp(), ensure_ascii=False) + "\n"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with _export_lock:
+            try:
+                if max_bytes and os.path.getsize(path) >= max_bytes:
+                    os.replace(path, f"{path}.1")
+            except FileNotFoundError:
+                pass
+            with open(path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(line)
+
+    def totals(self, span: Span) -> dict:
+        """LLM/tool calls, tokens, retries and throttling in ``span`` and everything under it."""
+        children = defaultdict(list)
+        with self.lock:
+            for other in self.spans:
+                children[other.parent_id].append(other)
+
+        def visit(span):
+            counts = defaultdict(int)
+            counts["retries"] += span.attributes.get("retries", 0)
+            counts["throttle_ms"] += span.attributes.get("throttle_ms", 0)
+            for child in children[span.span_id]:
+                if child.name == "llm.chat":
+                    counts["llm_calls"] += 1
+                    counts["prompt_tokens"] += child.attributes.get("llm.prompt_tokens", 0)
+                    counts["completion_tokens"] += child.attributes.get("llm.completion_tokens", 0)
+                elif child.name.startswith("tool."):
+                    counts["tool_calls"] += 1
+                for name, value in visit(child).items():
+                    counts[name] += value
+            return counts
+
+        return visit(span)
+
+    def breakdown(self) -> list:
+        """Per phase and per task: duration plus the totals underneath it."""
+        rows = []
+        for span in self.spans:
+            if span.name.startswith("phase.") or span.name == "task":
+                label = span.attributes.get("agent.role", span.name) if span.name == "task" else span.name[len("phase."):]
+                rows.append({
+                    "step": label if span.name.startswith("phase.") else f"  ↳ {label}",
+                    "seconds": round(span.duration, 2),
+                    "llm_calls": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "retries": 0,
+                    "throttle_ms": 0,
+                    **self.totals(span),
+                })
+        return rows
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def start_trace(name: str, path: Optional[str] = TRACE_FILE, **attributes: Any):
+    """Open a root span for one planning run; the trace is appended to ``path`` on exit."""
+    trace = Trace(name)
+    root = trace.start_span(name, None, **attributes)
+    token = _current_span.set(root)
+    try:
+        yield trace
+    except Exception as e:
+        root.end(error=e)
+        raise
+    finally:
+        root.end()
+        _current_span.reset(token)
+        if path:
+            trace.export(path)
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Child span of whatever span is current; a no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = parent.trace.start_span(name, parent, **attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.end(error=e)
+        raise
+    finally:
+        child.end()
+        _current_span.reset(token)
+
+
+def record_agent_step(step: Any) -> None:
+    """crewAI ``step_callback``: note each reasoning step on the running task's span."""
+    action = step[0][0] if isinstance(step, list) and step and isinstance(step[0], tuple) else step
+    current_span().add_event(
+        "agent.step",
+        tool=getattr(action, "tool", None),
+        finished=not hasattr(action, "tool"),
+    )
+
+
+def _prompt_tokens(messages: list) -> int:
+    """Prompt tokens as the chat completions API counts them: each message's text plus a few tokens of framing."""
+    from compaction import count_tokens
+
+    batch = [message for prompt in messages for message in prompt]
+    return sum(count_tokens(message.content if isinstance(message.content, str) else str(message.content)) + 3 for message in batch) + 3
+
+
+def _completion_tokens(response: Any) -> int:
+    from compaction import count_tokens
+
+    return sum(count_tokens(generation.text) for generations in response.generations for generation in generations)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Turns LangChain LLM callbacks into ``llm.chat`` spans under the current span."""
+
+    def __init__(self):
+        self._spans = {}
+        self._prompts = {}
+        self._streamed = Counter()
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: Any, **kwargs: Any) -> None:
+        parent = _current_span.get()
+        if parent is None:
+            return
+        params = kwargs.get("invocation_params") or {}
+        llm_span = parent.trace.start_span(
+            "llm.chat", parent,
+            **{"llm.model": params.get("model_name") or params.get("model"), "agent.step": parent.next_step()},
+        )
+        with self._lock:
+            self._spans[run_id] = llm_span
+            self._prompts[run_id] = messages
+
+    def on_llm_new_token(self, token: str, *, run_id: Any, **kwargs: Any) -> None:
+        if token:
+            with self._lock:
+                if run_id in self._spans:
+                    self._streamed[run_id] += 1
+
+    def on_llm_end(self, response: Any, *, run_id: Any, **kwargs: Any) -> None:
+        with self._lock:
+            llm_span = self._spans.pop(run_id, None)
+            messages = self._prompts.pop(run_id, None)
+            streamed = self._streamed.pop(run_id, 0)
+        if llm_span is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if not usage:
+            # Streamed completions come back without usage, so count them the way the API would.
+            usage = {"prompt_tokens": _prompt_tokens(messages or []), "completion_tokens": streamed or _completion_tokens(response)}
+            llm_span.set(**{"llm.tokens_estimated": True})
+        llm_span.set(**{
+            "llm.prompt_tokens": usage.get("prompt_tokens", 0),
+            "llm.completion_tokens": usage.get("completion_tokens", 0),
+        })
+        llm_span.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: Any, **kwargs: Any) -> None:
+        with self._lock:
+            llm_span = self._spans.pop(run_id, None)
+            self._prompts.pop(run_id, None)
+            self._streamed.pop(run_id, None)
+        if llm_span is not None:
+            llm_span.end(error=error)
+
+    def on_retry(self, retry_state: Any, *, run_id: Any, **kwargs: Any) -> None:
+        with self._lock:
+            llm_span = self._spans.get(run_id)
+        if llm_span is not None:
+            llm_span.increment("retries")
+
+
+TRACING_HANDLER = TracingCallbackHandler()
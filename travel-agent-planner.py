@@ -1,11 +1,20 @@
-import sys
-from unittest.mock import MagicMock
-sys.modules['pkg_resources'] = MagicMock()
+import time
+
 import streamlit as st
-import os
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from crewai_tools import SerperDevTool
+from budget import CURRENCY_CODES
+from jobs import JobQueueFull
+from search_cache import get_search_cache
+from fares import get_fare_store
+from plan_store import get_plan_store
+from llm_cache import get_completion_cache
+from resources import get_job_queue, get_llm, get_research_cache, get_search_tool, make_llm
+from streaming import FinalAnswerStreamHandler
+from coalesce import itinerary_flights, preliminary_flights
+from prefetch import PREFETCH, Prefetcher, prefetched
+from ratelimit import rate_limit_stats
+from startup import IMPORT_STATS, WARMUP, agent_stack_loaded, load_agent_stack, warm_up
+from tracing import TRACE_FILE
+# crewAI and the modules built on it (planner, compare) are imported on first use; see startup.py.
 
 
 # --- 1. UI CONFIGURATION ---
@@ -20,12 +29,78 @@ with st.sidebar:
     st.markdown("---")
     currency = st.selectbox("Currency", ["USD ($)", "INR (₹)"])
     unit = "$" if currency == "USD ($)" else "₹"
+    stream_output = st.toggle("Stream itinerary as it's written", value=True)
+    prefetch = st.toggle(
+        "Start searching while I type", value=PREFETCH,
+        help="Runs the usual first searches for your destination in the background. Uses Serper credits even if you don't generate a plan.",
+    )
+
+    with st.expander("⚡ Caches"):
+        cache_stats = get_search_cache().stats()
+        st.caption(
+            f"Search — Hits: {cache_stats['hits']} · Misses: {cache_stats['misses']} · "
+            f"Hit rate: {cache_stats['hit_rate']:.0%} · Entries: {cache_stats['entries']}"
+        )
+        llm_stats = get_completion_cache().stats()
+        st.caption(
+            f"LLM — Memory hits: {llm_stats['memory_hits']} · Disk hits: {llm_stats['disk_hits']} · "
+            f"Misses: {llm_stats['misses']} · Hit rate: {llm_stats['hit_rate']:.0%}"
+        )
+        plan_stats = get_plan_store().stats()
+        st.caption(
+            f"Plans — Hits: {plan_stats['hits']} · Misses: {plan_stats['misses']} · "
+            f"Entries: {plan_stats['entries']} · {plan_stats['bytes'] / 1024:,.0f} KB"
+        )
+        # Building the cache's embedder imports the OpenAI client, so wait for the agent stack to have done so.
+        if openai_key and agent_stack_loaded():
+            research_stats = get_research_cache(openai_key).stats()
+            st.caption(
+                f"Similar research — Hits: {research_stats['hits']} · Misses: {research_stats['misses']} · "
+                f"Entries: {research_stats['entries']} of {research_stats['capacity']}"
+            )
+        fare_stats = get_fare_store().stats()
+        st.caption(f"Fares — Observations: {fare_stats['observations']} · Routes: {fare_stats['routes']}")
+        st.caption(
+            f"Coalesced — Phase 1: {preliminary_flights.stats()['followers']} · "
+            f"Phase 2: {itinerary_flights.stats()['followers']}"
+        )
+        if "prefetcher" in st.session_state:
+            prefetch_stats = st.session_state["prefetcher"].store.stats()
+            st.caption(f"Prefetch — Searches: {prefetch_stats['searches']} · Used by agents: {prefetch_stats['hits']}")
+        job_stats = get_job_queue().stats()
+        st.caption(f"Jobs — Running: {job_stats['running']} · Queued: {job_stats['queued']}")
+        if agent_stack_loaded():
+            from planner import SPECULATION_STATS
+
+            st.caption(
+                f"Agent stack — Loaded by {IMPORT_STATS['loaded_by']} in "
+                f"{sum(IMPORT_STATS['import_seconds'].values()):.1f}s · "
+                f"RSS {IMPORT_STATS['rss_before_mb']:,.0f} → {IMPORT_STATS['rss_after_mb']:,.0f} MB"
+            )
+            if SPECULATION_STATS["drafts"]:
+                st.caption(
+                    f"Speculative itineraries — Kept: {SPECULATION_STATS['kept']} · "
+                    f"Cancelled: {SPECULATION_STATS['cancelled']} · Saved: {SPECULATION_STATS['saved_seconds']:.1f}s · "
+                    f"Wasted: {SPECULATION_STATS['wasted_tokens']:,} tokens"
+                )
+        for provider, counts in rate_limit_stats().items():
+            st.caption(
+                f"{provider.title()} — Requests: {counts.get('requests', 0)} · "
+                f"Throttled: {counts.get('throttle_seconds', 0):.1f}s · 429s: {counts.get('rate_limited', 0)} · "
+                f"Retries: {counts.get('retries', 0)} · Hedges: {counts.get('hedges', 0)}"
+            )
 
 # --- 2. USER INPUTS ---
+compare_mode = st.toggle(
+    "Compare several destinations",
+    help="Price and budget-check each destination side by side, then plan the one you pick.",
+)
 col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
     origin = st.text_input("Flying From", placeholder="e.g., Mumbai")
-    city = st.text_input("Going To", placeholder="e.g., London")
+    # Streamlit derives the widget's identity from its arguments, so they stay fixed across modes
+    # to keep what was typed when the comparison toggle changes.
+    city = st.text_input("Going To", placeholder="e.g., London (or London, Paris, Rome to compare)", key="city")
 with col2:
     month = st.text_input("Travel Month", placeholder="e.g., June 2026")
 with col3:
@@ -35,119 +110,193 @@ with col4:
 with col5:
     budget = st.number_input(f"Total Budget ({unit})", min_value=100, value=2000)
 
+# Searches for the trip start in the background once origin, city and month stop changing.
+prefetcher = st.session_state.setdefault("prefetcher", Prefetcher())
+if prefetch and serper_key and not compare_mode:
+    prefetcher.update(origin, city, month, lambda: get_search_tool(serper_key))
+
 # --- 3. THE AGENTIC ENGINE ---
-if st.button("Generate Complete Travel Plan"):
+# Planning runs on a background worker so reruns (any widget change) don't throw it away;
+# the page only submits the job and polls it.
+POLL_INTERVAL = 0.5
+jobs = get_job_queue()
+
+
+def run_plan_job(job, trip, openai_key, serper_key, stream, memo, prefetch_store=None):
+    """Runs on a job worker, so it reports through ``job`` instead of drawing on the page."""
+    from planner import plan_trip
+
+    # The itinerary writer gets a streaming twin so its answer can render token by token.
+    planner_llm = None
+    if stream:
+        stream_handler = FinalAnswerStreamHandler(lambda text: job.update(partial=text))
+        planner_llm = make_llm(openai_key, streaming=True, callbacks=[stream_handler])
+    with prefetched(prefetch_store):
+        return plan_trip(
+            **trip, openai_key=openai_key, llm=get_llm(openai_key), search_tool=get_search_tool(serper_key), verbose=True,
+            planner_llm=planner_llm, memo=memo, progress=lambda message, fraction: job.update(message, fraction),
+        )
+
+
+def run_compare_job(job, trip, cities, openai_key, serper_key):
+    """Phase 1 and the budget check for every candidate; the cost table fills in as each one lands."""
+    from compare import compare_destinations, format_comparison
+
+    def show(option, options):
+        job.update(
+            f"Compared {len(options)} of {len(cities)} destinations...", 0.95 * len(options) / len(cities),
+            format_comparison(options, trip["currency"]),
+        )
+
+    return compare_destinations(
+        trip["origin"], cities, trip["month"], trip["duration"], trip["people"], trip["budget"], trip["currency"],
+        openai_key=openai_key, llm=get_llm(openai_key), search_tool=get_search_tool(serper_key), verbose=True,
+        on_result=show,
+    )
+
+
+def submit_job(kind, fn, trip, *args):
+    """Queue ``fn`` and remember which kind of result ("plan" or "comparison") to collect."""
+    try:
+        st.session_state["plan_job"] = jobs.submit(fn, trip, *args)
+    except JobQueueFull as e:
+        st.warning(f"⏳ {e}")
+        return
+    st.session_state["plan_job_kind"] = kind
+    st.session_state[f"{kind}_trip"] = trip
+    st.session_state.pop(f"last_{kind}", None)
+    st.rerun()
+
+
+generate = st.button(
+    "Compare Destinations" if compare_mode else "Generate Complete Travel Plan",
+    disabled="plan_job" in st.session_state,
+)
+if generate:
     if not openai_key or not serper_key or not origin or not city:
         st.error("Please fill in all inputs and API keys.")
     else:
-        try:
-            with st.spinner(f"Step 1: Researching trip for {people} person(s)..."):
-                os.environ["OPENAI_API_KEY"] = openai_key
-                os.environ["SERPER_API_KEY"] = serper_key
-
-                search_tool = SerperDevTool()
-                llm = ChatOpenAI(model="gpt-4o-mini")
-
-                # --- AGENTS ---
-                researcher = Agent(
-                    role="Local Destination Expert",
-                    goal=f"Discover activities in {city} for {month} suitable for {people} people",
-                    backstory="Local expert focusing on group-friendly gems and weather.",
-                    tools=[search_tool], llm=llm, verbose=True
-                )
+        if not agent_stack_loaded():
+            with st.spinner("Loading the planner..."):
+                load_agent_stack()
+        from compare import unique_cities
 
-                transporter = Agent(
-                    role="Global Transport Specialist",
-                    goal=f"Find flight details from {origin} to {city} for {people} people",
-                    backstory="Expert in group travel logistics and ticket costs.",
-                    tools=[search_tool], llm=llm, verbose=True
-                )
+        trip = dict(origin=origin, city=city, month=month, duration=duration, people=people, budget=budget, currency=unit)
+        # A new request replaces whatever was on screen.
+        st.session_state.pop("last_comparison", None)
+        st.session_state.pop("last_plan", None)
+        if not compare_mode:
+            submit_job(
+                "plan", run_plan_job, trip, openai_key, serper_key, stream_output,
+                st.session_state.setdefault("phase1_memo", {}), prefetcher.store,
+            )
+        elif len(unique_cities(city.split(","))) < 2:
+            st.error("Enter at least two destinations, separated by commas.")
+        else:
+            submit_job("comparison", run_compare_job, trip, unique_cities(city.split(",")), openai_key, serper_key)
 
-                logistics_pro = Agent(
-                    role="Travel Logistics Pro",
-                    goal=f"Assemble a {duration}-day itinerary for {people} people and create a cost breakdown",
-                    backstory="Meticulous planner balancing flights and group costs with a final split-bill analysis.",
-                    tools=[search_tool], llm=llm, verbose=True
-                )
+job_id = st.session_state.get("plan_job")
+if job_id:
+    job = jobs.get(job_id)
+    if job is None:
+        del st.session_state["plan_job"]
+        st.warning("This plan request expired before it finished; please generate it again.")
+    elif not job.done:
+        position = jobs.position(job_id)
+        st.progress(job.progress, text=f"Queued behind {position} other plan(s)..." if position else job.message)
+        if job.partial:
+            st.markdown("---")
+            st.markdown(job.partial)
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+    else:
+        del st.session_state["plan_job"]
+        st.session_state[f"last_{st.session_state['plan_job_kind']}"] = jobs.collect(job_id)
 
-                # --- PHASE 1: PRELIMINARY DATA ---
-                research_task = Task(
-                    description=f"Identify top 5 sights in {city} for {people} people during {month}.",
-                    expected_output="A report on destination highlights.",
-                    agent=researcher
-                )
+# --- 4. RESULTS ---
+# Kept in the session so results stay on screen across later reruns.
+compared = st.session_state.get("last_comparison")
+if compared is not None:
+    trip = st.session_state["comparison_trip"]
+    if compared.error:
+        st.error(f"Something went wrong: {compared.error}")
+    else:
+        from compare import format_comparison
 
-                transport_task = Task(
-                    description=(
-                        f"Find flight options from {origin} to {city} for {people} travelers. "
-                        f"Provide the TOTAL cost for all {people} people in {unit}.\n"
-                        "- Include Airline, Flight Number, and Times."
-                    ),
-                    expected_output=f"A list containing flight details and total cost for {people} in {unit}.",
-                    agent=transporter
+        st.subheader("🧭 Destination Comparison")
+        st.markdown(format_comparison(compared.result, trip["currency"]))
+        plannable = [option for option in compared.result if option.status == "ok"]
+        if plannable:
+            choice = st.selectbox("Plan the full itinerary for", [option.city for option in plannable])
+            if st.button("Plan Itinerary", disabled="plan_job" in st.session_state):
+                # Only the chosen destination runs Phase 2; its Phase 1 results are reused as they are.
+                option = next(option for option in plannable if option.city == choice)
+                st.session_state["phase1_memo"] = option.memo
+                submit_job(
+                    "plan", run_plan_job, dict(trip, city=option.city), openai_key, serper_key, stream_output,
+                    option.memo,
                 )
 
-                preliminary_crew = Crew(
-                    agents=[researcher, transporter],
-                    tasks=[research_task, transport_task],
-                    process=Process.sequential
-                )
-                
-                preliminary_results = preliminary_crew.kickoff()
-                transport_info = str(preliminary_results)
-
-                # --- BUDGET VALIDATION ---
-                daily_min_per_person = 80 if unit == "$" else 6000 
-                total_stay_min = daily_min_per_person * duration * people
-                
-                check_prompt = f"""
-                Analyze travel data:
-                Budget: {unit}{budget}. People: {people}. Duration: {duration} days.
-                Transport Found: {transport_info}
-                Rule: A {duration}-day stay for {people} people typically requires {unit}{total_stay_min} for food/hotel.
-                
-                If (Transport + Stay) > {budget}, return 'INSUFFICIENT: [Estimated Min Total]'.
-                Otherwise return 'SUFFICIENT'.
-                """
-                
-                validation_check = llm.predict(check_prompt)
-
-                if "INSUFFICIENT" in validation_check:
-                    min_needed = validation_check.split(":")[1].strip()
-                    st.error("❌ Budget Not Sufficient")
-                    st.warning(f"For {people} people for {duration} days, you need at least **{unit}{min_needed}**.")
-                    st.stop()
-
-            # --- PHASE 2: FINAL PLANNING ---
-            with st.spinner("Step 2: Budget sufficient! Finalizing itinerary and cost split..."):
-                itinerary_task = Task(
-                    description=(
-                        f"Create a {duration}-day itinerary for {people} people in {city}. \n"
-                        "MANDATORY:\n"
-                        "1. Include 'Travel Logistics' at the top with total flight costs.\n"
-                        "2. Provide the daily itinerary.\n"
-                        "3. AT THE VERY END, provide a '💰 Group Cost Summary' table with: \n"
-                        "- Total Flight Cost\n"
-                        "- Estimated Total Hotel/Food Cost\n"
-                        "- Total Trip Cost\n"
-                        "- COST PER PERSON."
-                    ),
-                    expected_output=f"A {duration}-day Markdown plan for {people} people in {unit} including a cost-split table.",
-                    agent=logistics_pro,
-                    context=[research_task, transport_task]
-                )
+finished = st.session_state.get("last_plan")
+if finished is not None:
+    trip = st.session_state["plan_trip"]
+    result = finished.result
+    if finished.error:
+        st.error(f"Something went wrong: {finished.error}")
+    else:
+        if result.created_at:
+            age = time.time() - result.created_at
+            age_text = f"{age / 3600:.1f} hours" if age >= 3600 else f"{max(age // 60, 1):.0f} min"
+            st.info(f"⚡ Served from saved plans — this answer is {age_text} old.")
+        if result.reused:
+            st.info(f"♻️ Reused {' and '.join(result.reused)} results from earlier in this session.")
+        if result.research_match:
+            st.info(
+                f"🔎 Reused destination research done for \"{result.research_match['request']}\" "
+                f"({result.research_match['similarity']:.0%} similar)."
+            )
+        if result.fare_estimate:
+            st.info(
+                f"✈️ Flight costs come from {result.fare_estimate['count']} recently seen fares on this route "
+                f"(median {trip['currency']}{result.fare_estimate['p50']:,.0f} per person)."
+            )
+
+        # --- BUDGET VALIDATION ---
+        if result.budget_check.get("transport_status") == "currency_mismatch":
+            st.warning(
+                f"Flight costs came back in {result.budget_check['transport_currency']}, not {CURRENCY_CODES[trip['currency']]}, "
+                "so the budget check only covers food and hotel."
+            )
+        elif result.budget_check["transport_total"] is None:
+            st.warning("Couldn't read structured flight costs, so the budget check only covers food and hotel.")
 
-                final_crew = Crew(agents=[logistics_pro], tasks=[itinerary_task])
-                final_plan = final_crew.kickoff()
+        if result.status == "insufficient_budget":
+            st.error("❌ Budget Not Sufficient")
+            st.warning(
+                f"For {trip['people']} people for {trip['duration']} days, you need at least "
+                f"**{trip['currency']}{result.budget_check['min_total']:,.0f}**."
+            )
+        else:
+            # --- FINAL DISPLAY ---
+            before = sum(handoff["tokens_before"] for handoff in result.handoffs.values())
+            after = sum(handoff["tokens_after"] for handoff in result.handoffs.values())
+            st.success(f"✅ Your {trip['duration']}-Day Plan for {trip['people']} is Ready!")
+            st.markdown("---")
+            st.markdown(result.plan)
+            if result.handoffs:
+                st.caption(f"Phase 1 handoff compacted from {before:,} to {after:,} tokens.")
+            if result.speculation:
+                st.caption(f"Itinerary started {result.speculation['saved_seconds']:.2f}s early, alongside the budget check.")
 
-                # --- FINAL DISPLAY ---
-                st.success(f"✅ Your {duration}-Day Plan for {people} is Ready!")
-                st.markdown("---")
-                
-                if hasattr(final_plan, 'raw'):
-                    st.markdown(final_plan.raw)
-                else:
-                    st.markdown(str(final_plan))
+        with st.sidebar.expander("⏱️ Last Run Timing", expanded=True):
+            st.dataframe(result.breakdown, hide_index=True)
+            if result.governor:
+                st.caption(
+                    f"Searches: {result.governor['tool_calls']} · Repeats answered in-run: "
+                    f"{result.governor['deduplicated']} · Blocked by limits: {result.governor['limited']}"
+                )
+            st.caption(f"Trace {result.trace_id[:8]} saved to {TRACE_FILE}")
 
-        except Exception as e:
-            st.error(f"Something went wrong: {e}")
\ No newline at end of file
+# Import the agent stack while the user fills in the form, so the first Generate doesn't wait for it.
+if WARMUP:
+    warm_up()